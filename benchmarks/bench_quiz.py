@@ -0,0 +1,196 @@
+"""Micro-benchmarks for the bank loader, quiz sampler and grader on synthetic banks.
+
+Usage:
+    python benchmarks/bench_quiz.py                                  # 1k, 100k and 1M rows
+    python benchmarks/bench_quiz.py --sizes 1000 100000
+    python benchmarks/bench_quiz.py --output benchmarks/baseline.json  # Write a new baseline
+    python benchmarks/bench_quiz.py --compare benchmarks/baseline.json # Show change against a baseline
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import quiz_bank
+import quiz_lint
+
+# --- Synthetic Bank Configuration ---
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+TYPE_MIX = {'MCQ': 0.38, 'TF': 0.18, 'FillBlank': 0.25, 'Matching': 0.19}  # Share of rows, close to test_bank.csv
+GROUP_SIZE_RANGE = (3, 9)  # Terms per matching group (test_bank.csv averages about 5)
+HEADER = ['Type', 'Question', 'CorrectAnswer', 'Distractor1', 'Distractor2', 'Distractor3', 'Explanation']
+
+# --- Quiz Shape Used for Sampling and Grading ---
+QUIZ_COUNTS = {'MCQ': 20, 'TF': 10, 'FillBlank': 10}
+QUIZ_GROUPS = 3
+SAMPLE_REPEATS = 200
+GRADE_REPEATS = 2_000
+
+
+def generate_bank(filename, rows, seed=0):
+    """Writes a synthetic bank with the same schema and type mix as test_bank.csv."""
+    rng = random.Random(seed)
+    types = list(TYPE_MIX)
+    weights = list(TYPE_MIX.values())
+    written = 0
+    group_number = 0
+
+    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(HEADER)
+        while written < rows:
+            q_type = rng.choices(types, weights)[0]
+            page = rng.randint(1, 200)
+            explanation = f"Page {page} states the synthetic fact number {written}[cite: {rng.randint(1, 400)}]."
+
+            if q_type == 'Matching':
+                # Matching terms arrive as consecutive rows sharing a group name
+                group_number += 1
+                group_size = min(rng.randint(*GROUP_SIZE_RANGE), rows - written)
+                for term in range(group_size):
+                    writer.writerow(['Matching', f"Match terms for group: Synthetic Group {group_number}",
+                                     f"TERM-{group_number}-{term}", f"Definition of term {term} in group {group_number}",
+                                     '', '', explanation])
+                written += group_size
+                continue
+
+            if q_type == 'MCQ':
+                row = ['MCQ', f"Synthetic multiple choice question {written}?", f"Answer {written}",
+                       f"Distractor A{written}", f"Distractor B{written}", f"Distractor C{written}", explanation]
+            elif q_type == 'TF':
+                row = ['TF', f"Synthetic statement {written} is true.", rng.choice(['True', 'False']),
+                       'N/A', 'N/A', 'N/A', explanation]
+            else:
+                row = ['FillBlank', f"Synthetic blank question {written}: ______.", f"word{written}",
+                       '', '', '', explanation]
+            writer.writerow(row)
+            written += 1
+
+
+def synthetic_answers(pool, rng):
+    """Answers roughly 70% of items correctly, in the formats the app stores."""
+    answers = {}
+    for i, q_data in enumerate(pool):
+        q_type = q_data['Type']
+        if q_type == 'MatchingGroup':
+            answers[i] = {
+                term_idx: term['Definition'] if rng.random() < 0.7 else 'wrong'
+                for term_idx, term in enumerate(q_data['MatchingTerms'])
+            }
+        elif q_type == 'TF':
+            answers[i] = q_data['CorrectAnswer'] if rng.random() < 0.7 else not q_data['CorrectAnswer']
+        else:
+            answers[i] = q_data['CorrectAnswer'] if rng.random() < 0.7 else 'wrong'
+    return answers
+
+
+def measure(func, repeats):
+    """Times `repeats` calls, then repeats one call under tracemalloc for its memory profile."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = func()
+    seconds = (time.perf_counter() - start) / repeats
+
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    retained = func()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    retained_blocks = sys.getallocatedblocks() - blocks_before
+    del retained
+
+    return result, {'seconds': seconds, 'peak_bytes': peak_bytes, 'retained_blocks': retained_blocks}
+
+
+def run_size(rows, workdir):
+    filename = os.path.join(workdir, f"bank_{rows}.csv")
+    generate_bank(filename, rows)
+    rng = random.Random(rows)
+    results = {}
+
+    # Parse: CSV -> question dicts (the body of load_and_process_questions)
+    parse_repeats = 3 if rows <= 100_000 else 1
+    (questions_by_type, matching_groups, all_questions), stats = measure(
+        lambda: quiz_bank.parse_question_bank(filename), parse_repeats)
+    stats['rows_per_second'] = rows / stats['seconds']
+    results['parse'] = stats
+
+    # Sample: the pool construction done by start_quiz
+    groups = sorted(matching_groups)
+    selected_groups = rng.sample(groups, min(QUIZ_GROUPS, len(groups)))
+    pool, stats = measure(lambda: quiz_bank.build_quiz_pool(
+        questions_by_type, matching_groups, QUIZ_COUNTS, selected_groups), SAMPLE_REPEATS)
+    stats['quizzes_per_second'] = 1 / stats['seconds']
+    results['sample'] = stats
+
+    # Grade: the scoring loop of display_results_quiz
+    answers = synthetic_answers(pool, rng)
+    scored_items = sum(q.get('TermCount', 1) for q in pool)
+    _, stats = measure(lambda: quiz_bank.score_quiz(pool, answers), GRADE_REPEATS)
+    stats['items_per_second'] = scored_items / stats['seconds']
+    results['grade'] = stats
+
+    # Lint: every authoring check over the whole bank (quiz_bank.py lint)
+    report, stats = measure(lambda: quiz_lint.lint_bank(filename), parse_repeats)
+    stats['rows_per_second'] = rows / stats['seconds']
+    stats['issues'] = len(report['issues'])
+    results['lint'] = stats
+
+    os.remove(filename)
+    return results
+
+
+def compare(results, baseline):
+    """Prints time and peak-memory ratios against a previous baseline (lower is better)."""
+    for size, stages in results.items():
+        for stage, stats in stages.items():
+            old = baseline.get('results', {}).get(size, {}).get(stage)
+            if not old:
+                continue
+            time_ratio = stats['seconds'] / old['seconds']
+            memory_ratio = stats['peak_bytes'] / old['peak_bytes'] if old['peak_bytes'] else float('nan')
+            print(f"{size:>9} {stage:<7} time x{time_ratio:5.2f}  peak memory x{memory_ratio:5.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Bank sizes in rows")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--compare', help="Baseline JSON file to compare against")
+    args = parser.parse_args()
+
+    random.seed(0)
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.sizes:
+            results[str(rows)] = run_size(rows, workdir)
+            for stage, stats in results[str(rows)].items():
+                print(f"{rows:>9} {stage:<7} {stats['seconds'] * 1000:10.3f} ms  "
+                      f"peak {stats['peak_bytes'] / 1024:10.1f} KiB  retained blocks {stats['retained_blocks']}")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(report, output_file, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            compare(results, json.load(baseline_file))
+
+
+if __name__ == '__main__':
+    main()
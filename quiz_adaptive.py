@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+# --- Adaptive Testing Configuration ---
+THETA_GRID = np.linspace(-4.0, 4.0, 81)  # Ability values the information tables are computed on
+TABLE_DEPTH = 64  # Items kept per grid point; must exceed the longest adaptive test
+SCALING = 1.7  # Logistic scaling constant so the 2PL curve approximates the normal ogive
+MIN_ATTEMPTS_FOR_CALIBRATION = 5  # Attempts needed before an item's own data outweighs the defaults
+DEFAULT_DIFFICULTY = {'TF': -1.0, 'MCQ': 0.0, 'FillBlank': 1.0}  # Used until an item has recorded attempts
+# Adaptive quizzes aim every trainee at p = 0.5, so their proportion correct says nothing about ability
+UNCALIBRATED_MODES = {'adaptive'}
+MIN_DISCRIMINATION = 0.3
+MAX_DISCRIMINATION = 2.5
+
+
+# --- Item Calibration ---
+def calibrate_items(items, attempts):
+    """Estimates 2PL discrimination (a) and difficulty (b) for each item from recorded attempts.
+
+    `attempts` is a DataFrame with `quiz_id`, `item_id` and `correct` columns (and optionally
+    `mode`); `item_id` matches the item's stable `id`. Attempts from UNCALIBRATED_MODES are
+    ignored. Items with few attempts are shrunk towards defaults.
+    """
+    a = np.ones(len(items))
+    b = np.array([default_parameters(q.get('Type'))[1] for q in items])
+    if attempts is not None and 'mode' in attempts:
+        attempts = attempts[~attempts['mode'].isin(UNCALIBRATED_MODES)]
+    if attempts is None or attempts.empty or not items:
+        return a, b
+
+    item_lookup = pd.Index([q['id'] for q in items])
+    attempts = attempts.assign(item_pos=item_lookup.get_indexer(attempts['item_id']))
+    attempts = attempts[attempts['item_pos'] >= 0]
+    if attempts.empty:
+        return a, b
+
+    # Person score = share of the attempt's items answered correctly (a rough ability proxy)
+    x = attempts['correct'].astype(float)
+    y = x.groupby(attempts['quiz_id']).transform('mean')
+    stats = pd.DataFrame({'pos': attempts['item_pos'], 'x': x, 'y': y, 'xy': x * y, 'yy': y * y})
+    sums = stats.groupby('pos').agg(n=('x', 'size'), sx=('x', 'sum'), sy=('y', 'sum'),
+                                    sxy=('xy', 'sum'), syy=('yy', 'sum'))
+
+    n = sums['n'].to_numpy(dtype=float)
+    pos = sums.index.to_numpy()
+    p = (sums['sx'].to_numpy() + 1.0) / (n + 2.0)  # Laplace-smoothed proportion correct
+    mean_y = sums['sy'].to_numpy() / n
+    cov = sums['sxy'].to_numpy() / n - (sums['sx'].to_numpy() / n) * mean_y
+    var_x = (sums['sx'].to_numpy() / n) * (1.0 - sums['sx'].to_numpy() / n)
+    var_y = np.maximum(sums['syy'].to_numpy() / n - mean_y ** 2, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = np.where((var_x > 0) & (var_y > 0), cov / np.sqrt(var_x * var_y), 0.0)
+    r = np.clip(r, 0.0, 0.95)
+
+    item_a = np.where(r > 0, r / np.sqrt(1.0 - r ** 2), 1.0)
+    item_a = np.clip(item_a, MIN_DISCRIMINATION, MAX_DISCRIMINATION)
+    item_b = np.clip(-np.log(p / (1.0 - p)) / (SCALING * item_a), THETA_GRID[0], THETA_GRID[-1])
+
+    weight = n / (n + MIN_ATTEMPTS_FOR_CALIBRATION)
+    a[pos] = weight * item_a + (1.0 - weight) * a[pos]
+    b[pos] = weight * item_b + (1.0 - weight) * b[pos]
+    return a, b
+
+
+def probability_correct(theta, a, b):
+    """2PL probability of a correct answer."""
+    return 1.0 / (1.0 + np.exp(-SCALING * a * (theta - b)))
+
+
+def item_information(theta, a, b):
+    """Fisher information each item carries about ability `theta`."""
+    p = probability_correct(theta, a, b)
+    return (SCALING * a) ** 2 * p * (1.0 - p)
+
+
+def default_parameters(q_type):
+    """(a, b) of an item that has no calibration, e.g. one edited out of the calibrated bank."""
+    return 1.0, DEFAULT_DIFFICULTY.get(q_type, 0.0)
+
+
+# --- Item Selection ---
+def nearest_grid_point(theta):
+    """Index of the THETA_GRID value closest to `theta`."""
+    g = int(np.clip(np.searchsorted(THETA_GRID, theta), 1, len(THETA_GRID) - 1))
+    return g - 1 if theta - THETA_GRID[g - 1] <= THETA_GRID[g] - theta else g
+
+
+class ItemInformationIndex:
+    """Precomputed ranking of the most informative items at every point of THETA_GRID.
+
+    Built once per calibration and shared by every session. A pick is a binary search on
+    the grid followed by a walk past items the trainee has already seen, so it does not
+    depend on the size of the bank.
+    """
+
+    def __init__(self, a, b, depth=TABLE_DEPTH):
+        self.a = np.asarray(a, dtype=float)
+        self.b = np.asarray(b, dtype=float)
+        item_count = len(self.a)
+        depth = min(depth, item_count)
+        self.table = np.empty((len(THETA_GRID), depth), dtype=np.int64)
+        for g, theta in enumerate(THETA_GRID):
+            info = item_information(theta, self.a, self.b)
+            if depth < item_count:
+                top = np.argpartition(-info, depth - 1)[:depth]
+            else:
+                top = np.arange(item_count)
+            self.table[g] = top[np.argsort(-info[top], kind='stable')]
+
+    def __len__(self):
+        return len(self.a)
+
+    def select(self, theta, administered):
+        """Returns the position of the most informative item not in `administered`, or None."""
+        for item_pos in self.table[nearest_grid_point(theta)]:
+            if int(item_pos) not in administered:
+                return int(item_pos)
+
+        # Only reached when a test runs longer than the table depth
+        if len(administered) >= len(self.a):
+            return None
+        info = item_information(theta, self.a, self.b)
+        info[list(administered)] = -np.inf
+        return int(np.argmax(info))
+
+
+# --- Ability Estimation ---
+def initial_log_posterior():
+    """Standard normal prior over THETA_GRID, as a plain list so it can live in session state."""
+    return (-0.5 * THETA_GRID ** 2).tolist()
+
+
+def update_log_posterior(log_posterior, a, b, correct):
+    """Folds one graded response into the log posterior over THETA_GRID."""
+    p = probability_correct(THETA_GRID, a, b)
+    likelihood = p if correct else 1.0 - p
+    return (np.asarray(log_posterior) + np.log(np.maximum(likelihood, 1e-12))).tolist()
+
+
+def estimate_ability(log_posterior):
+    """Returns the EAP ability estimate and its standard error."""
+    log_posterior = np.asarray(log_posterior)
+    posterior = np.exp(log_posterior - log_posterior.max())
+    posterior /= posterior.sum()
+    theta = float(np.dot(THETA_GRID, posterior))
+    se = float(np.sqrt(np.dot((THETA_GRID - theta) ** 2, posterior)))
+    return theta, se
+
+
+def should_stop(se, administered_count, max_items, target_se, min_items=5):
+    """Stops once the precision target is met (after a minimum length) or the length cap is hit."""
+    if administered_count >= max_items:
+        return True
+    return administered_count >= min_items and se <= target_se
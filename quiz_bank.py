@@ -0,0 +1,346 @@
+import argparse
+import csv
+import hashlib
+import json
+import random
+import sys
+from collections import defaultdict
+
+# --- Question Bank ---
+# Streamlit-free loading, sampling and grading, shared by the app, the benchmarks and the CLI
+
+STANDARD_TYPES = ["MCQ", "TF", "FillBlank"] # Question types answered with a single value
+
+# Map column indices based on the provided headers
+# Default mappings based on your header: Type,Question,CorrectAnswer,Distractor1,Distractor2,Distractor3,Explanation
+TYPE_IDX = 0  # 'Type' column
+QUESTION_IDX = 1  # 'Question' column
+ANSWER_IDX = 2  # 'CorrectAnswer' column
+EXP_IDX = 6  # 'Explanation' column
+DISTRACTOR_INDICES = [3, 4, 5]  # 'Distractor1', 'Distractor2', 'Distractor3'
+
+
+# --- Stable Question IDs ---
+def normalize_text(value):
+    """Lowercases and collapses whitespace so cosmetic edits don't change ids."""
+    return ' '.join(str(value).split()).lower()
+
+
+def stable_id(*parts):
+    """Short hex digest of normalized content; the same content gets the same id in every bank version."""
+    # NUL is not whitespace, so normalizing the joined string keeps the part boundaries
+    return _digest(normalize_text('\x00'.join(str(part).strip() for part in parts)))
+
+
+def _digest(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def matching_group_id(group_name):
+    """Id of a consolidated matching group question."""
+    return stable_id('MatchingGroup', group_name)
+
+
+# --- Data Loading ---
+def parse_row(row):
+    """Parses one CSV row into a question dict without its position, or None if the row is unusable.
+
+    'id' identifies the question (type and question text; group and term for matching rows), so
+    fixing an answer or explanation keeps the id. 'content_hash' covers the whole row.
+    """
+    content_hash = _digest('\x1f'.join(row))  # Exact content: any edit, even whitespace, counts as a change
+    cells = [cell.strip() for cell in row]
+    cells.extend([''] * (EXP_IDX + 1 - len(cells)))  # Short rows read as empty trailing cells
+    q_type = cells[TYPE_IDX]
+    question_text = cells[QUESTION_IDX]
+    explanation = cells[EXP_IDX]
+
+    if q_type.lower() == 'matching':
+        # Extract the group name from the question
+        # Assuming format: "Match terms for group: [Group Name]" or just the group name
+        group = question_text.split(":", 1)[1].strip() if ":" in question_text else question_text
+
+        # For matching questions, the term will be in the CorrectAnswer column
+        term = cells[ANSWER_IDX]
+
+        # For matching, we need definitions - these would be in the distractor columns
+        definition = next((cells[idx] for idx in DISTRACTOR_INDICES if cells[idx]), '')
+
+        if not (group and term):
+            return None
+        return {
+            'Type': 'Matching',
+            'Group': group,
+            'Term': term,              # This is the abbreviation (left side)
+            'Question': question_text, # Original question text
+            'Definition': definition,  # This is the explanation (right side)
+            'CorrectAnswer': definition,  # For grading consistency
+            'Explanation': explanation,
+            'id': stable_id('Matching', group, term),
+            'content_hash': content_hash,
+        }
+
+    if q_type in STANDARD_TYPES:
+        answer = cells[ANSWER_IDX]
+        question_dict = {
+            'Type': q_type,
+            'Question': question_text,
+            'CorrectAnswer': answer,
+            'Explanation': explanation,
+            'id': stable_id(q_type, question_text),
+            'content_hash': content_hash,
+        }
+
+        # Handle type-specific processing
+        if q_type == 'MCQ':
+            # Get distractors from specified columns
+            question_dict['Distractors'] = [cells[idx] for idx in DISTRACTOR_INDICES if cells[idx]]
+        elif q_type == 'TF':
+            # Convert to boolean
+            question_dict['CorrectAnswer'] = answer.lower() == 'true'
+        return question_dict
+
+    return None
+
+
+def parse_question_bank(filename, row_cache=None):
+    """Parses the CSV bank into (questions_by_type, matching_groups, all_questions_list).
+
+    Pass the same `row_cache` dict on every load to reprocess only rows that were added or
+    edited since the last load; it is pruned to the rows of this file afterwards.
+    Raises OSError/csv.Error for unreadable files; malformed rows are skipped.
+    """
+    questions_by_type = defaultdict(list)
+    matching_groups = defaultdict(list)
+    all_questions_list = []
+    seen_rows = {} if row_cache is not None else None
+    id_counts = defaultdict(int)
+
+    # Simple CSV reading approach without pandas to reduce complexity
+    with open(filename, 'r', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        headers = next(reader, None)  # Get headers
+
+        # Process rows
+        row_index = 0
+        for row in reader:
+            if not row or len(row) < 3:  # Skip rows with insufficient data
+                continue
+
+            row_key = tuple(row) if row_cache is not None else None
+            if row_key is not None and row_key in row_cache:
+                parsed = row_cache[row_key]
+            else:
+                try:
+                    parsed = parse_row(row)
+                except Exception:
+                    # Skip problematic rows but continue processing
+                    parsed = None
+            if seen_rows is not None:
+                seen_rows[row_key] = parsed
+            if parsed is None:
+                continue
+
+            question_dict = dict(parsed, original_index=row_index)
+
+            # Repeated questions get an occurrence suffix so ids stay unique within the bank
+            id_counts[parsed['id']] += 1
+            if id_counts[parsed['id']] > 1:
+                question_dict['id'] = f"{parsed['id']}-{id_counts[parsed['id']]}"
+
+            # Add to collections
+            if question_dict['Type'] == 'Matching':
+                matching_groups[question_dict['Group']].append(question_dict)
+            questions_by_type[question_dict['Type']].append(question_dict)
+            all_questions_list.append(question_dict)
+            row_index += 1
+
+    if row_cache is not None:
+        row_cache.clear()
+        row_cache.update(seen_rows)
+
+    # Always return a valid tuple of results
+    return dict(questions_by_type), dict(matching_groups), all_questions_list
+
+
+# --- Bank Versioning ---
+class BankChangedError(ValueError):
+    """The bank file no longer holds the version that was asked for."""
+
+
+def file_version(filename):
+    """Digest of the bank file's bytes; the same content has the same version on every host, whatever its mtime."""
+    with open(filename, 'rb') as bank_file:
+        return hashlib.blake2b(bank_file.read(), digest_size=8).hexdigest()
+
+
+def build_manifest(all_questions):
+    """Lists every question id with its content hash, plus a version hash of the whole bank."""
+    items = {q['id']: q['content_hash'] for q in all_questions}
+    version = stable_id(*sorted(f"{item_id}:{content_hash}" for item_id, content_hash in items.items()))
+    return {'version': version, 'question_count': len(items), 'items': items}
+
+
+def diff_manifests(old_manifest, new_manifest):
+    """Returns the ids added, removed and changed between two manifests."""
+    old_items = old_manifest.get('items', {})
+    new_items = new_manifest.get('items', {})
+    return {
+        'from_version': old_manifest.get('version'),
+        'to_version': new_manifest.get('version'),
+        'added': sorted(new_items.keys() - old_items.keys()),
+        'removed': sorted(old_items.keys() - new_items.keys()),
+        'changed': sorted(k for k in new_items.keys() & old_items.keys() if new_items[k] != old_items[k]),
+    }
+
+
+# --- Quiz Sampling ---
+def build_quiz_pool(questions_by_type, matching_groups, selected_counts, selected_groups):
+    """Samples the requested number of each standard type plus one question per matching group, shuffled."""
+    final_pool = []
+
+    # Add MCQ, TF, FillBlank based on counts
+    for q_type, questions in questions_by_type.items():
+        if q_type == 'Matching': continue  # Handle matching separately
+
+        count = selected_counts.get(q_type, 0)
+        num_available = len(questions)
+        actual_count = min(count, num_available)  # Ensure we don't request more than available
+
+        if actual_count > 0:
+            final_pool.extend(random.sample(questions, actual_count))
+
+    # Add selected Matching groups as consolidated group questions (one per group)
+    for group_name in selected_groups:
+        if group_name in matching_groups:
+            # Get all terms for this group
+            group_terms = matching_groups[group_name]
+
+            if group_terms:
+                # Create a single question object that represents the entire matching group
+                matching_question = {
+                    'Type': 'MatchingGroup',  # Different type to distinguish from individual matching items
+                    'id': matching_group_id(group_name),
+                    'Group': group_name,
+                    'Question': f"Match the following terms for: {group_name}",
+                    'MatchingTerms': group_terms,  # Store all terms in this group
+                    'TermCount': len(group_terms)
+                }
+
+                # Add just one question object for the entire group
+                final_pool.append(matching_question)
+
+    random.shuffle(final_pool)  # Shuffle the order of questions
+    return final_pool
+
+
+# --- Grading ---
+def is_answer_correct(q_data, user_answer):
+    """Grades a single MCQ/TF/FillBlank answer the same way the results page does."""
+    if user_answer is None:
+        return False
+    if q_data.get('Type') == "TF":
+        return user_answer == q_data.get('CorrectAnswer')
+    return str(user_answer).strip().lower() == str(q_data.get('CorrectAnswer')).strip().lower()
+
+
+def is_match_correct(selected_definition, correct_definition):
+    """Grades one term of a matching group."""
+    return str(selected_definition).strip().lower() == str(correct_definition).strip().lower()
+
+
+def score_quiz(quiz_pool, user_answers):
+    """Scores a quiz; matching groups count one point per term.
+
+    Returns a dict with score, interactive_question_count, matching_term_count,
+    matching_correct_count and answered_count.
+    """
+    score = 0
+    interactive_question_count = 0  # Count only questions that were interactively answerable
+    answered_count = 0
+    matching_term_count = 0  # Count of individual matching terms
+    matching_correct_count = 0  # Count of correctly matched terms
+
+    for i, q_data in enumerate(quiz_pool):
+        user_answer = user_answers.get(i)
+        q_type = q_data.get('Type')
+
+        # Handle different question types for scoring
+        if q_type in STANDARD_TYPES:
+            interactive_question_count += 1
+            if user_answer is not None:
+                answered_count += 1
+                if is_answer_correct(q_data, user_answer):
+                    score += 1
+
+        elif q_type == "MatchingGroup":
+            # For matching groups, each term is counted separately
+            matching_terms = q_data.get('MatchingTerms', [])
+            matching_term_count += len(matching_terms)
+
+            # Count answered terms
+            if user_answer:  # Dictionary of {term_idx: selected_definition}
+                answered_count += len(user_answer)
+
+                # Check correct matches
+                for term_idx, term_data in enumerate(matching_terms):
+                    if term_idx in user_answer and is_match_correct(user_answer[term_idx], term_data.get('Definition', '')):
+                        matching_correct_count += 1
+                        score += 1
+
+    return {
+        'score': score,
+        'interactive_question_count': interactive_question_count,
+        'matching_term_count': matching_term_count,
+        'matching_correct_count': matching_correct_count,
+        'answered_count': answered_count,
+    }
+
+
+# --- Command Line ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Question bank tools.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    manifest_parser = subparsers.add_parser('manifest', help="Build a bank version manifest and diff it against a previous one")
+    manifest_parser.add_argument('bank', help="Question bank CSV")
+    compare_group = manifest_parser.add_mutually_exclusive_group()
+    compare_group.add_argument('--previous', help="Previous manifest JSON to diff against")
+    compare_group.add_argument('--check', metavar='MANIFEST', help="Exit 1 if this manifest does not match the bank (stale)")
+    manifest_parser.add_argument('--output', help="Write the new manifest to this file")
+
+    lint_parser = subparsers.add_parser('lint', help="Check the bank for authoring errors; exits 1 if any are found")
+    lint_parser.add_argument('bank', help="Question bank CSV")
+    lint_parser.add_argument('--strict', action='store_true', help="Fail on warnings as well as errors")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'manifest':
+        _, _, all_questions = parse_question_bank(args.bank)
+        manifest = build_manifest(all_questions)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as manifest_file:
+                json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+        if args.previous or args.check:
+            with open(args.previous or args.check, encoding='utf-8') as previous_file:
+                report = diff_manifests(json.load(previous_file), manifest)
+        else:
+            report = {'version': manifest['version'], 'question_count': manifest['question_count']}
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        if args.check and report['from_version'] != report['to_version']:
+            print(f"{args.check} is stale; regenerate it with: python quiz_bank.py manifest {args.bank} --output {args.check}", file=sys.stderr)
+            return 1
+
+    elif args.command == 'lint':
+        import quiz_lint  # Needs pandas, which the rest of this module does not
+        report = quiz_lint.lint_bank(args.bank)
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        if report['errors'] or (args.strict and report['warnings']):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import random
+import re
+import sqlite3
+import pandas as pd
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# --- Source References ---
+# Explanations cite the source document as "Page 39 states ...[cite: 75]" or "[cite: 340, 341]"
+PAGE_PATTERN = re.compile(r'\b[Pp]ages?\s+(\d+)')
+CITE_PATTERN = re.compile(r'\[cite:\s*([\d,\s]+)\]')
+
+
+def extract_references(text):
+    """Returns (pages, cites) referenced by an explanation, each a tuple of ints in order of appearance."""
+    if not text:
+        return (), ()
+    pages = tuple(dict.fromkeys(int(page) for page in PAGE_PATTERN.findall(text)))
+    cites = tuple(dict.fromkeys(int(cite) for group in CITE_PATTERN.findall(text) for cite in group.replace(',', ' ').split()))
+    return pages, cites
+
+
+# --- Page Index ---
+class PageIndex:
+    """Maps source pages to the questions that cite them, built once per bank version."""
+
+    def __init__(self, all_questions):
+        self.pages_by_item = {}  # {item_id: (page, ...)}
+        self.items_by_page = defaultdict(lambda: defaultdict(list))  # {page: {q_type: [question dicts]}}
+        self.cites_by_page = defaultdict(set)  # {page: {cite, ...}}
+        self.uncited_by_type = defaultdict(list)  # {q_type: [question dicts citing no page]}
+
+        for q in all_questions:
+            pages, cites = extract_references(q.get('Explanation', ''))
+            if not pages:
+                self.uncited_by_type[q['Type']].append(q)
+                continue
+            self.pages_by_item[q['id']] = pages
+            for page in pages:
+                self.items_by_page[page][q['Type']].append(q)
+                self.cites_by_page[page].update(cites)
+
+        self.items_by_page = {page: dict(by_type) for page, by_type in self.items_by_page.items()}
+        self.uncited_by_type = dict(self.uncited_by_type)
+        self.pages = sorted(self.items_by_page)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def item_pages(self):
+        """DataFrame of (item_id, page) with one row per page an item cites, as coverage counts them."""
+        pages = pd.Series(self.pages_by_item, dtype=object).explode()
+        return pd.DataFrame({'item_id': pages.index.astype(object), 'page': pages.to_numpy(dtype='int64')})
+
+    def question_count(self, page):
+        return sum(len(questions) for questions in self.items_by_page.get(page, {}).values())
+
+    def coverage_delta(self, graded_items):
+        """Turns [(item_id, correct), ...] into {page: [answered, correct]} for the pages those items cite."""
+        delta = defaultdict(lambda: [0, 0])
+        for item_id, correct in graded_items:
+            for page in self.pages_by_item.get(item_id, ()):
+                delta[page][0] += 1
+                delta[page][1] += int(correct)
+        return dict(delta)
+
+    def rank_pages(self, coverage):
+        """Pages ordered from the biggest gap: never answered first, then lowest accuracy, then fewest answers."""
+        def gap(page):
+            answered, correct = coverage.get(page, (0, 0))
+            return (answered > 0, correct / answered if answered else 0.0, answered, page)
+        return sorted(self.pages, key=gap)
+
+    def sample_gaps(self, coverage, q_type, count, exclude_ids=(), rng=random):
+        """Picks up to `count` questions of one type, one per page per pass, starting from the weakest pages.
+
+        Once every cited question of the type is picked, the rest are drawn at random from the uncited ones.
+        """
+        chosen = []
+        chosen_ids = set(exclude_ids)
+        queues = {}  # Per-page candidates, shuffled on first use
+        ranked = [page for page in self.rank_pages(coverage) if self.items_by_page[page].get(q_type)]
+
+        while len(chosen) < count and ranked:
+            remaining_pages = []
+            for page in ranked:
+                if len(chosen) >= count:
+                    break
+                queue = queues.get(page)
+                if queue is None:
+                    queue = queues[page] = rng.sample(self.items_by_page[page][q_type], len(self.items_by_page[page][q_type]))
+                while queue and queue[-1]['id'] in chosen_ids:
+                    queue.pop()  # Already picked through another page it cites
+                if queue:
+                    q = queue.pop()
+                    chosen.append(q)
+                    chosen_ids.add(q['id'])
+                    if queue:
+                        remaining_pages.append(page)
+            ranked = remaining_pages
+
+        if len(chosen) < count:
+            uncited = [q for q in self.uncited_by_type.get(q_type, []) if q['id'] not in chosen_ids]
+            chosen.extend(rng.sample(uncited, min(count - len(chosen), len(uncited))))
+        return chosen
+
+
+# --- Per-User Coverage ---
+class SQLiteCoverageStore:
+    """Per-user, per-page answer counters, incremented after every graded quiz."""
+
+    def __init__(self, filename, timeout=10.0):
+        self.filename = filename
+        self.timeout = timeout
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS page_coverage ("
+                "user TEXT NOT NULL, page INTEGER NOT NULL, answered INTEGER NOT NULL, correct INTEGER NOT NULL, "
+                "updated_at REAL NOT NULL, PRIMARY KEY (user, page))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.filename, timeout=self.timeout)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self, user):
+        """Returns {page: [answered, correct]} for one user."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT page, answered, correct FROM page_coverage WHERE user = ?", (user,)).fetchall()
+        return {page: [answered, correct] for page, answered, correct in rows}
+
+    def add(self, user, delta):
+        """Adds a quiz's {page: [answered, correct]} to the user's counters."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO page_coverage (user, page, answered, correct, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(user, page) DO UPDATE SET answered = answered + excluded.answered, "
+                "correct = correct + excluded.correct, updated_at = excluded.updated_at",
+                [(user, page, answered, correct, now) for page, (answered, correct) in delta.items()]
+            )
@@ -0,0 +1,227 @@
+"""Interaction event log: buffered JSONL writing and session replay.
+
+Usage:
+    python quiz_events.py sessions                    # Sessions found in the log, most recent first
+    python quiz_events.py replay SESSION_ID           # Rebuild a session's quiz state from its events
+    python quiz_events.py replay SESSION_ID --events  # Also print the events in order
+"""
+import argparse
+import glob
+import itertools
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+# --- Event Log ---
+# Every interaction that changes quiz state is one JSON line:
+# {"ts": 1760900000.123, "seq": 7, "event": "answer_set", "session": ..., "quiz": ..., "q": 3, "item": ..., ...}
+# Events: start, answer_set, flag, navigate, verify, check, submit, reset
+FILE_PATTERN = "events-*.jsonl"
+
+
+class EventLog:
+    """Queues events in memory and appends them to rotating JSONL files from a daemon thread.
+
+    `emit` never blocks: when the queue is full the event is dropped and counted. Each process
+    writes its own files, so several workers can share one directory; `max_files` applies to the
+    whole directory.
+    """
+
+    def __init__(self, directory, max_queue=10000, batch_size=500, flush_interval=1.0,
+                 max_file_bytes=16 * 1024 * 1024, max_files=100):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval  # Longest an event waits for more events to share its write
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files  # Files kept in the directory (all processes); the oldest are deleted on rotation
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._seq = itertools.count()
+        self._file = None
+        self.emitted = 0
+        self.dropped = 0
+        self.written = 0
+        self.write_errors = 0
+        self._writer = threading.Thread(target=self._write_loop, name="quiz-event-log", daemon=True)
+        self._writer.start()
+
+    def emit(self, event):
+        """Timestamps an event and queues it for writing."""
+        event = dict(event, ts=time.time(), seq=next(self._seq))
+        try:
+            self._queue.put_nowait(event)
+            self.emitted += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Blocks until every queued event has been written (or failed to write)."""
+        self._queue.join()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+                self.written += len(batch)
+            except (OSError, TypeError, ValueError):
+                self.write_errors += 1  # The batch is lost; the app keeps running
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        lines = "".join(json.dumps(event, separators=(',', ':'), default=str) + "\n" for event in batch)
+        try:
+            full = self._file is None or os.path.getsize(self._file) >= self.max_file_bytes
+        except OSError:
+            full = True  # Deleted or rotated away by something else; start a new file
+        if full:
+            self._rotate()
+        try:
+            with open(self._file, 'a', encoding='utf-8') as log_file:
+                log_file.write(lines)
+        except OSError:
+            self._file = None  # The next batch starts a new file instead of failing on this one forever
+            raise
+
+    def _rotate(self):
+        os.makedirs(self.directory, exist_ok=True)
+        # Retention covers files from earlier runs and other workers too, oldest first; one slot is left for the new file
+        existing = []
+        for filename in glob.glob(os.path.join(self.directory, FILE_PATTERN)):
+            try:
+                existing.append((os.path.getmtime(filename), filename))
+            except OSError:
+                pass  # Removed by another worker meanwhile
+        for _, filename in sorted(existing)[:max(0, len(existing) - self.max_files + 1)]:
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+        self._file = os.path.join(self.directory, f"events-{stamp}-{os.getpid()}.jsonl")
+
+    def stats(self):
+        """Counters for monitoring: emitted, dropped, written, write errors and queued."""
+        return {'emitted': self.emitted, 'dropped': self.dropped, 'written': self.written,
+                'write_errors': self.write_errors, 'queued': self._queue.qsize()}
+
+
+# --- Reading and Replay ---
+def read_events(directory, session_id=None):
+    """Yields logged events in file order, optionally only those of one session; unreadable lines are skipped."""
+    for filename in sorted(glob.glob(os.path.join(directory, FILE_PATTERN))):
+        with open(filename, encoding='utf-8') as log_file:
+            for line in log_file:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # Partial line from a crash mid-write
+                if session_id is None or event.get('session') == session_id:
+                    yield event
+
+
+def _decode_answer(value):
+    # Matching answers are {term_idx: definition}; JSON turned the keys into strings
+    if isinstance(value, dict):
+        return {int(k): v for k, v in value.items()}
+    return value
+
+
+def replay_session(events):
+    """Rebuilds the state of one session from its events, in the shape of the app's session state."""
+    state = {'phase': 'setup', 'quiz_id': None, 'events': 0}
+    # Events from several workers are merged by time; seq keeps one worker's events in emit order
+    for event in sorted(events, key=lambda e: (e.get('ts', 0), e.get('seq', 0))):
+        state['events'] += 1
+        kind = event.get('event')
+        q_idx = event.get('q')
+
+        if kind == 'start':
+            items = event.get('items', [])
+            state = {
+                'phase': 'quiz', 'quiz_id': event.get('quiz'), 'events': state['events'],
+                'started_at': event.get('ts'), 'items': items, 'current_question_index': 0,
+                'user_answers': {i: None for i in range(len(items))},
+                'flagged_questions': {i: False for i in range(len(items))},
+                'verified_matching_questions': {}, 'checked_answers': {},
+                'submitted': False, 'auto_submitted': False,
+            }
+        elif kind == 'reset':
+            state = {'phase': 'setup', 'quiz_id': None, 'events': state['events'], 'previous_quiz_id': state.get('quiz_id')}
+        elif state['phase'] == 'setup' or event.get('quiz') != state['quiz_id']:
+            continue  # Quiz started before the log window, or an event from a stale tab
+        elif kind == 'navigate':
+            if q_idx >= len(state['items']):  # Adaptive quizzes add an item each time they advance
+                state['items'].append(event.get('item'))
+                state['user_answers'][q_idx] = None
+                state['flagged_questions'][q_idx] = False
+            state['current_question_index'] = q_idx
+        elif kind == 'answer_set':
+            state['user_answers'][q_idx] = _decode_answer(event.get('value'))
+        elif kind == 'flag':
+            state['flagged_questions'][q_idx] = bool(event.get('value'))
+        elif kind == 'verify':
+            state['verified_matching_questions'][q_idx] = True
+        elif kind == 'check':
+            state['checked_answers'][q_idx] = True
+        elif kind == 'submit':
+            state['phase'] = 'results'
+            state['submitted'] = True
+            state['auto_submitted'] = bool(event.get('auto'))
+            state['submitted_at'] = event.get('ts')
+    return state
+
+
+def list_sessions(events):
+    """Summarizes events per session: count, quizzes started and last activity."""
+    sessions = {}
+    for event in events:
+        summary = sessions.setdefault(event.get('session'), {'session': event.get('session'), 'events': 0, 'quizzes': 0, 'last_ts': 0})
+        summary['events'] += 1
+        summary['quizzes'] += event.get('event') == 'start'
+        summary['last_ts'] = max(summary['last_ts'], event.get('ts', 0))
+    return sorted(sessions.values(), key=lambda s: s['last_ts'], reverse=True)
+
+
+# --- Command Line ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', default=os.environ.get("QUIZ_EVENT_LOG_DIR", "event_logs"), help="Event log directory")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('sessions', help="List logged sessions")
+    replay_parser = subparsers.add_parser('replay', help="Rebuild one session's state from its events")
+    replay_parser.add_argument('session', help="Session id (the ?session= value in the app URL)")
+    replay_parser.add_argument('--events', action='store_true', help="Print the session's events before the state")
+    args = parser.parse_args(argv)
+
+    if args.command == 'sessions':
+        for summary in list_sessions(read_events(args.dir)):
+            last = datetime.fromtimestamp(summary['last_ts'], timezone.utc).isoformat()
+            print(f"{summary['session']}  {summary['events']:6} events  {summary['quizzes']:3} quizzes  last {last}")
+        return 0
+
+    events = list(read_events(args.dir, args.session))
+    if not events:
+        print(f"No events found for session {args.session} in {args.dir}", file=sys.stderr)
+        return 1
+    if args.events:
+        for event in sorted(events, key=lambda e: (e.get('ts', 0), e.get('seq', 0))):
+            print(json.dumps(event))
+    json.dump(replay_session(events), sys.stdout, indent=2, default=str)
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
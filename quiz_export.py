@@ -0,0 +1,57 @@
+import argparse
+import json
+import os
+import sys
+
+import quiz_bank
+
+# --- Static Self-Study Export ---
+# Compiles the bank into one HTML file that runs the quiz entirely in the browser
+
+TEMPLATE_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "export", "self_study.html")
+TYPE_CODES = {'MCQ': 'M', 'TF': 'T', 'FillBlank': 'F'}  # One-letter type codes keep the embedded JSON small
+
+
+def compact_bank(questions_by_type, matching_groups):
+    """Packs the bank into nested lists: standard questions and matching groups, without field names."""
+    questions = []
+    for q_type in quiz_bank.STANDARD_TYPES:
+        for q in questions_by_type.get(q_type, []):
+            answer = q.get('CorrectAnswer')
+            if q_type == 'TF':
+                answer = "True" if answer else "False"
+            questions.append([TYPE_CODES[q_type], q.get('Question', ''), answer,
+                              q.get('Distractors', []), q.get('Explanation', '')])
+
+    groups = [
+        [group_name, [[t.get('Term', ''), t.get('Definition', ''), t.get('Explanation', '')] for t in terms]]
+        for group_name, terms in sorted(matching_groups.items())
+    ]
+    return {'q': questions, 'g': groups}
+
+
+def build_static_bundle(questions_by_type, matching_groups, title="Self-Study Quiz"):
+    """Returns the self-contained HTML page for the given bank."""
+    with open(TEMPLATE_FILENAME, encoding='utf-8') as template_file:
+        template = template_file.read()
+    bank_json = json.dumps(compact_bank(questions_by_type, matching_groups), separators=(',', ':'), ensure_ascii=False)
+    bank_json = bank_json.replace('</', '<\\/')  # Keep question text from closing the <script> tag
+    return template.replace('__TITLE__', title).replace('__BANK_JSON__', bank_json)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the question bank as a static self-study page.")
+    parser.add_argument('bank', help="Question bank CSV")
+    parser.add_argument('--output', default="self_study.html", help="HTML file to write")
+    parser.add_argument('--title', default="Self-Study Quiz", help="Page title")
+    args = parser.parse_args(argv)
+
+    questions_by_type, matching_groups, all_questions = quiz_bank.parse_question_bank(args.bank)
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        output_file.write(build_static_bundle(questions_by_type, matching_groups, args.title))
+    print(f"Wrote {len(all_questions)} questions to {args.output} ({os.path.getsize(args.output) / 1024:.1f} KiB)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import re
+
+import pandas as pd
+
+import quiz_bank
+
+# --- Bank Linting ---
+# Column-wise checks over the whole bank; the loader skips bad rows silently, this reports them
+
+LINT_COLUMNS = quiz_bank.EXP_IDX + 2  # Expected columns plus one to catch rows with stray trailing cells
+TOO_MANY_FIELDS = re.compile(r'Expected \d+ fields in line \d+, saw (\d+)')  # pandas C parser error for an over-wide row
+TF_ANSWERS = {'true', 'false'}
+
+# code: (severity, message)
+LINT_CHECKS = {
+    'empty_bank': ('error', "Bank has no question rows"),
+    'unknown_type': ('error', "Type is not MCQ, TF, FillBlank or Matching; the row is skipped"),
+    'missing_question': ('error', "Question is empty"),
+    'missing_answer': ('error', "CorrectAnswer is empty"),
+    'tf_answer_invalid': ('error', "TF answer is not True or False; it is read as False"),
+    'mcq_no_distractors': ('error', "MCQ has no distractors"),
+    'mcq_distractor_is_answer': ('error', "A distractor equals the correct answer"),
+    'mcq_duplicate_distractor': ('warning', "Two distractors are the same"),
+    'matching_missing_group': ('error', "Matching row has no group name; the row is skipped"),
+    'matching_missing_term': ('error', "Matching row has no term; the row is skipped"),
+    'matching_missing_definition': ('error', "Matching row has no definition"),
+    'matching_duplicate_term': ('error', "Term appears more than once in its group"),
+    'matching_duplicate_definition': ('warning', "Definition appears more than once in its group"),
+    'duplicate_question': ('warning', "Same question text as an earlier row of the same type"),
+    'extra_columns': ('error', "Row has cells after Explanation (often an unquoted comma); they are ignored"),
+}
+
+
+def read_bank_columns(filename):
+    """Reads the bank as string columns indexed by row number (the header is row 1, as in a spreadsheet).
+
+    The frame is at least LINT_COLUMNS wide; a row with more cells widens it instead of failing the read.
+    """
+    width = LINT_COLUMNS
+    while True:
+        try:
+            frame = pd.read_csv(
+                filename, header=None, skiprows=1, names=range(width), dtype=str,
+                keep_default_na=False, skip_blank_lines=False, encoding='utf-8'
+            )
+            break
+        except pd.errors.ParserError as e:
+            # Rereading is only paid for banks that have over-wide rows; their extra cells become extra_columns
+            match = TOO_MANY_FIELDS.search(str(e))
+            if match is None or int(match.group(1)) <= width:
+                raise
+            width = int(match.group(1))
+    frame.index = frame.index + 2
+    return frame
+
+
+def _normalized(column):
+    """Vectorized quiz_bank.normalize_text: the text question ids are hashed from."""
+    return column.str.replace(r'\s+', ' ', regex=True).str.strip().str.lower()
+
+
+def _graded(column):
+    """Vectorized form of the comparison quiz_bank.is_answer_correct makes (trimmed, case-insensitive)."""
+    return column.str.strip().str.lower()
+
+
+def lint_columns(frame):
+    """Runs every check over the bank columns; returns a DataFrame of issues sorted by row."""
+    cells = {i: frame[i].str.strip() for i in range(quiz_bank.EXP_IDX + 1)}
+    q_type = cells[quiz_bank.TYPE_IDX]
+    question = cells[quiz_bank.QUESTION_IDX]
+    answer = cells[quiz_bank.ANSWER_IDX]
+    distractors = [cells[i] for i in quiz_bank.DISTRACTOR_INDICES]
+
+    blank = (q_type == '') & (question == '') & (answer == '')
+    is_matching = q_type.str.lower() == 'matching'
+    is_standard = q_type.isin(quiz_bank.STANDARD_TYPES)
+    is_mcq = q_type == 'MCQ'
+    found = {}
+
+    found['unknown_type'] = ~blank & ~is_matching & ~is_standard
+    found['missing_question'] = is_standard & (question == '')
+    found['missing_answer'] = is_standard & (answer == '')
+    found['tf_answer_invalid'] = (q_type == 'TF') & (answer != '') & ~answer.str.lower().isin(TF_ANSWERS)
+    found['extra_columns'] = ~blank & pd.concat(
+        [frame[i].str.strip() != '' for i in range(quiz_bank.EXP_IDX + 1, frame.shape[1])], axis=1).any(axis=1)
+
+    # MCQ options are compared exactly the way answers are graded: trimmed and case-insensitive
+    # Each check only transforms the rows it applies to
+    mcq_answer = _graded(answer[is_mcq])
+    mcq_distractors = [_graded(d[is_mcq]) for d in distractors]
+    found['mcq_no_distractors'] = is_mcq & pd.concat([d == '' for d in distractors], axis=1).all(axis=1)
+    distractor_is_answer = pd.Series(False, index=mcq_answer.index)
+    duplicate_distractor = pd.Series(False, index=mcq_answer.index)
+    for i, distractor in enumerate(mcq_distractors):
+        distractor_is_answer |= (distractor != '') & (distractor == mcq_answer)
+        for other in mcq_distractors[i + 1:]:
+            duplicate_distractor |= (distractor != '') & (distractor == other)
+    found['mcq_distractor_is_answer'] = distractor_is_answer
+    found['mcq_duplicate_distractor'] = duplicate_distractor
+
+    # Matching rows: same group and definition extraction as quiz_bank.parse_row
+    group = question[is_matching].str.replace(r'^[^:]*:', '', n=1, regex=True).str.strip()
+    definition = distractors[-1][is_matching]
+    for d in reversed(distractors[:-1]):
+        definition = d[is_matching].where(d[is_matching] != '', definition)
+    term = answer[is_matching]
+    found['matching_missing_group'] = group == ''
+    found['matching_missing_term'] = (group != '') & (term == '')
+    found['matching_missing_definition'] = (group != '') & (term != '') & (definition == '')
+
+    # Duplicates: rows whose ids would collide (same normalized text); every occurrence after the first is reported
+    norm_group = _normalized(group)
+    found['matching_duplicate_term'] = (term != '') & pd.DataFrame(
+        {'group': norm_group, 'term': _normalized(term)}).duplicated()
+    found['matching_duplicate_definition'] = (definition != '') & pd.DataFrame(
+        {'group': norm_group, 'definition': _normalized(definition)}).duplicated()
+    standard_question = question[is_standard]
+    found['duplicate_question'] = (standard_question != '') & pd.DataFrame(
+        {'type': q_type[is_standard], 'question': _normalized(standard_question)}).duplicated()
+
+    issues = []
+    if not (~blank).any():
+        severity, message = LINT_CHECKS['empty_bank']
+        issues.append(pd.DataFrame([{'row': None, 'severity': severity, 'code': 'empty_bank', 'message': message}]))
+    for code, mask in found.items():
+        rows = mask[mask].index
+        if len(rows):
+            severity, message = LINT_CHECKS[code]
+            issues.append(pd.DataFrame({'row': rows, 'severity': severity, 'code': code, 'message': message}))
+    if not issues:
+        return pd.DataFrame(columns=['row', 'severity', 'code', 'message'])
+    return pd.concat(issues, ignore_index=True).sort_values(['row', 'code'], kind='stable', ignore_index=True)
+
+
+def lint_bank(filename):
+    """Lints a bank CSV and returns a JSON-ready report."""
+    try:
+        frame = read_bank_columns(filename)
+    except (pd.errors.ParserError, UnicodeDecodeError) as e:
+        # Not a row shape problem (those are reported per row), e.g. an unclosed quote or a non-UTF-8 file
+        issues = pd.DataFrame([{'row': None, 'severity': 'error', 'code': 'malformed_csv', 'message': str(e).strip()}])
+        frame = pd.DataFrame()
+    else:
+        issues = lint_columns(frame)
+
+    counts = issues['severity'].value_counts()
+    return {
+        'bank': filename,
+        'rows': len(frame),
+        'errors': int(counts.get('error', 0)),
+        'warnings': int(counts.get('warning', 0)),
+        'by_code': {code: int(n) for code, n in issues['code'].value_counts().sort_index().items()},
+        'issues': [
+            {'row': None if pd.isna(issue['row']) else int(issue['row']), 'severity': issue['severity'],
+             'code': issue['code'], 'message': issue['message']}
+            for issue in issues.to_dict('records')
+        ],
+    }
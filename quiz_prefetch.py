@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Background Precomputation ---
+# Builds each session's likely next quiz on a small shared thread pool so starting it is a dictionary swap
+
+
+class QuizPrefetcher:
+    """Runs at most one precomputation per owner (session) on a bounded thread pool.
+
+    `build(cancelled)` runs on a worker thread; it must not touch Streamlit state and should
+    return early once the `cancelled` event is set. Results are handed out once, only to the
+    owner that asked for them and only for the same settings signature.
+    """
+
+    def __init__(self, max_workers=2, max_pending=256, ttl_seconds=900):
+        self.max_pending = max_pending  # Oldest owners beyond this are cancelled (abandoned sessions)
+        self.ttl_seconds = ttl_seconds  # Unclaimed results older than this are dropped
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="quiz-prefetch")
+        self._entries = OrderedDict()  # {owner: (signature, future, cancelled_event, submitted_at)}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.cancelled = 0
+
+    def prefetch(self, owner, signature, build):
+        """Starts building for `owner` unless the same signature is already pending; replaces stale work."""
+        with self._lock:
+            entry = self._entries.get(owner)
+            if entry is not None and entry[0] == signature and not entry[1].cancelled():
+                return
+            if entry is not None:
+                self._cancel(entry)
+            cancelled = threading.Event()
+            future = self._executor.submit(build, cancelled)
+            self._entries[owner] = (signature, future, cancelled, time.time())
+            self._entries.move_to_end(owner)
+            self._prune()
+
+    def take(self, owner, signature):
+        """Returns the finished (or still running) result for these settings, or None on a miss.
+
+        A build still queued behind other sessions' builds is cancelled instead; the caller builds inline.
+        """
+        with self._lock:
+            entry = self._entries.pop(owner, None)
+            if entry is None or entry[0] != signature or entry[1].cancel():
+                if entry is not None:
+                    self._cancel(entry)
+                self.misses += 1
+                return None
+        try:
+            result = entry[1].result()  # Already running or done: waiting is never slower than starting over
+        except Exception:
+            result = None  # Cancelled or failed; the caller builds the quiz itself
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def cancel(self, owner):
+        """Drops any pending work for `owner`."""
+        with self._lock:
+            entry = self._entries.pop(owner, None)
+            if entry is not None:
+                self._cancel(entry)
+
+    def _cancel(self, entry):
+        # Called with the lock held; queued work never starts, running work sees the event and stops early
+        entry[2].set()
+        entry[1].cancel()
+        self.cancelled += 1
+
+    def _prune(self):
+        # Called with the lock held
+        now = time.time()
+        for owner, entry in list(self._entries.items()):
+            if len(self._entries) <= self.max_pending and now - entry[3] <= self.ttl_seconds:
+                break
+            del self._entries[owner]
+            self._cancel(entry)
+
+    def stats(self):
+        """Counters for monitoring: hits, misses, cancelled and pending."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'cancelled': self.cancelled, 'pending': len(self._entries)}
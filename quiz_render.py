@@ -0,0 +1,121 @@
+import sys
+import threading
+from collections import OrderedDict
+
+# --- Question Rendering ---
+# The parts of a question page that are the same for every user, built once and shared
+
+
+def render_static_parts(q_data):
+    """Builds the user-independent strings and option lists for one question.
+
+    Lists are stored as tuples because the cache shares them between sessions; copy before shuffling.
+    """
+    q_type = q_data.get('Type', 'N/A')
+    parts = {
+        'question_md': f"**{q_data.get('Question', 'N/A')}**",
+        'explanation': q_data.get('Explanation', 'No explanation provided.'),
+    }
+
+    if q_type in ('MCQ', 'TF', 'FillBlank'):
+        correct_answer = q_data.get('CorrectAnswer', 'N/A')
+        parts['correct_md'] = f"Correct answer: **{correct_answer}**"
+        if q_type == 'MCQ':
+            parts['options'] = tuple(q_data.get('Distractors', [])) + (correct_answer,)
+
+    elif q_type == 'MatchingGroup':
+        matching_terms = q_data.get('MatchingTerms', [])
+        parts['group_md'] = f"**Matching Group: {q_data.get('Group', 'Unknown Group')}**"
+        parts['definitions'] = tuple(term.get('Definition', 'No definition') for term in matching_terms)
+        parts['terms'] = tuple(
+            {
+                'term': term.get('Term', 'Unknown Term'),
+                'label_md': f"**{i+1}. {term.get('Term', 'Unknown Term')}**",
+                'result_md': f"**{term.get('Term', 'Unknown Term')}**",
+                'correct_md': f"Correct match: **{term.get('Definition', 'No definition')}**",
+            }
+            for i, term in enumerate(matching_terms)
+        )
+
+    elif q_type == 'Matching':
+        parts['info_md'] = f"""
+        **Matching Term:**
+        Term: **{q_data.get('Term', 'N/A')}**
+        Group: **{q_data.get('Group', 'N/A')}**
+        Definition: **{q_data.get('Definition', 'N/A')}**
+
+        *(Note: This is part of a matching group. Please see the group question.)*
+        """
+
+    return parts
+
+
+def estimate_size(value):
+    """Approximate memory held by a rendered entry, in bytes."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(v) for v in value)
+    return size
+
+
+# --- Render Cache ---
+class RenderCache:
+    """Thread-safe LRU cache of rendered questions, bounded by an approximate memory budget."""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # {key: (parts, size)} from least to most recently used
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_render(self, key, render):
+        """Returns the cached entry for `key`, calling `render()` to build it on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Render outside the lock; two sessions missing the same key at once both render, which is harmless
+        parts = render()
+        size = estimate_size(parts)
+        if size > self.max_bytes:
+            return parts  # Larger than the whole budget; serve it uncached
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (parts, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+        return parts
+
+    def get_question(self, q_data, bank_version):
+        """Returns the static parts of a question from one bank version; questions without an id are not cached."""
+        if q_data.get('id') is None:
+            return render_static_parts(q_data)
+        return self.get_or_render((q_data['id'], bank_version), lambda: render_static_parts(q_data))
+
+    def stats(self):
+        """Counters for monitoring: hits, misses, evictions, entries and bytes held."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
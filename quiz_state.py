@@ -0,0 +1,219 @@
+import abc
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# --- Serialization ---
+# Quiz state uses int-keyed dicts ({index_in_quiz_pool: answer}); JSON would turn those keys into strings
+INT_KEYS_TAG = "__int_keys__"
+
+
+def _encode(value):
+    if isinstance(value, dict):
+        if value and all(isinstance(k, int) and not isinstance(k, bool) for k in value):
+            return {INT_KEYS_TAG: [[k, _encode(v)] for k, v in value.items()]}
+        return {k: _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if INT_KEYS_TAG in value and len(value) == 1:
+            return {int(k): _decode(v) for k, v in value[INT_KEYS_TAG]}
+        return {k: _decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+def dumps_state(state):
+    """Serializes a quiz state dict to JSON, keeping int dict keys intact."""
+    return json.dumps(_encode(state), separators=(',', ':'))
+
+
+def loads_state(payload):
+    """Inverse of dumps_state."""
+    return _decode(json.loads(payload))
+
+
+# --- Backends ---
+class StateBackend(abc.ABC):
+    """Interface for stores that hold quiz state outside the Streamlit process."""
+
+    @abc.abstractmethod
+    def load(self, session_id):
+        """Returns the serialized state for a session, or None if it is unknown."""
+
+    @abc.abstractmethod
+    def save(self, session_id, payload):
+        """Stores the serialized state for a session, replacing any previous value."""
+
+    @abc.abstractmethod
+    def delete(self, session_id):
+        """Removes a session's state."""
+
+    @abc.abstractmethod
+    def prune(self, older_than):
+        """Removes sessions last saved before the `older_than` timestamp; returns how many were removed."""
+
+
+class SQLiteStateBackend(StateBackend):
+    """SQLite-backed store shared by the worker processes of one host.
+
+    WAL mode relies on shared memory and file locks that network filesystems do not provide, so
+    never put this file on a volume shared between hosts. Workers on several hosts (pods) need a
+    networked StateBackend, e.g. one backed by Redis or Postgres.
+    """
+
+    def __init__(self, filename, timeout=10.0):
+        self.filename = filename
+        self.timeout = timeout
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")  # Readers don't block the writer of another process on this host
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS quiz_sessions ("
+                "session_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS quiz_sessions_updated_at ON quiz_sessions (updated_at)")
+
+    @contextmanager
+    def _connect(self):
+        # A connection per call keeps the backend safe to use from the flush thread and script threads
+        conn = sqlite3.connect(self.filename, timeout=self.timeout)
+        try:
+            with conn:  # Commits on success, rolls back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self, session_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT state FROM quiz_sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def save(self, session_id, payload):
+        self.save_many([(session_id, payload)])
+
+    def save_many(self, items):
+        """Stores several sessions in one transaction."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO quiz_sessions (session_id, state, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+                [(session_id, payload, now) for session_id, payload in items]
+            )
+
+    def delete(self, session_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM quiz_sessions WHERE session_id = ?", (session_id,))
+
+    def prune(self, older_than):
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM quiz_sessions WHERE updated_at < ?", (older_than,)).rowcount
+
+
+# --- Write-Behind Cache ---
+class WriteBehindCache:
+    """Keeps the latest state of each session in memory and flushes changes to a backend in batches.
+
+    Scripts never wait on the backend to save; a daemon thread writes dirty sessions every
+    `flush_interval` seconds. A crash loses at most that interval of answers. The same thread
+    deletes sessions nobody has touched for `session_ttl` seconds from the backend.
+    """
+
+    def __init__(self, backend, flush_interval=1.0, max_sessions=10000, session_ttl=7 * 24 * 3600, prune_interval=3600):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.max_sessions = max_sessions  # Clean sessions beyond this are dropped from memory, oldest first
+        self.session_ttl = session_ttl  # Sessions not saved for this long are deleted (None keeps them forever)
+        self.prune_interval = prune_interval
+        self._next_prune = time.monotonic()
+        self._latest = OrderedDict()  # {session_id: payload} as last saved by this worker
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._flusher = threading.Thread(target=self._flush_loop, name="quiz-state-flush", daemon=True)
+        self._flusher.start()
+
+    def get(self, session_id):
+        """Returns the session state, preferring this worker's unflushed copy over the backend."""
+        with self._lock:
+            if session_id in self._dirty:
+                return loads_state(self._latest[session_id])
+        payload = self.backend.load(session_id)
+        if payload is None:
+            return None
+        with self._lock:
+            self._latest[session_id] = payload
+        return loads_state(payload)
+
+    def put(self, session_id, state):
+        """Records the session state; unchanged state is not written again."""
+        payload = dumps_state(state)
+        with self._lock:
+            if self._latest.get(session_id) == payload:
+                return
+            self._latest[session_id] = payload
+            self._latest.move_to_end(session_id)
+            self._dirty.add(session_id)
+            self._evict()
+
+    def _evict(self):
+        # Called with the lock held; dirty sessions are kept until they have been flushed
+        for session_id in list(self._latest):
+            if len(self._latest) <= self.max_sessions:
+                break
+            if session_id not in self._dirty:
+                del self._latest[session_id]
+
+    def flush(self):
+        """Writes every dirty session to the backend now."""
+        with self._lock:
+            items = [(session_id, self._latest[session_id]) for session_id in self._dirty]
+            self._dirty.clear()
+        if not items:
+            return
+        try:
+            if hasattr(self.backend, 'save_many'):
+                self.backend.save_many(items)
+            else:
+                for session_id, payload in items:
+                    self.backend.save(session_id, payload)
+        except Exception:
+            # Put them back so the next flush retries, unless a newer state replaced them meanwhile
+            with self._lock:
+                for session_id, payload in items:
+                    if self._latest.get(session_id) == payload:
+                        self._dirty.add(session_id)
+            raise
+
+    def prune(self):
+        """Deletes sessions older than session_ttl from the backend; returns how many were removed."""
+        if self.session_ttl is None:
+            return 0
+        cutoff = time.time() - self.session_ttl
+        removed = self.backend.prune(cutoff)
+        with self._lock:
+            # Drop this worker's clean copies too, or a later get() would serve a session the backend no longer has
+            for session_id in [s for s in self._latest if s not in self._dirty]:
+                del self._latest[session_id]
+        return removed
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                pass  # Backend unavailable; dirty sessions are retried on the next tick
+            if time.monotonic() >= self._next_prune:
+                self._next_prune = time.monotonic() + self.prune_interval
+                try:
+                    self.prune()
+                except Exception:
+                    pass  # Retried on the next prune interval
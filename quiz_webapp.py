@@ -1,12 +1,61 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import csv
+import hmac
+import os
 import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
 import pandas as pd
-from collections import defaultdict
+
+import quiz_adaptive
+import quiz_bank
+import quiz_coverage
+import quiz_events
+import quiz_export
+import quiz_prefetch
+import quiz_render
+import quiz_state
 
 # --- Configuration ---
 QUIZ_PASSWORD = "aatw"
+INSTRUCTOR_PASSWORD_SECRET = "instructor_password" # Key in .streamlit/secrets.toml; the cohort dashboard is hidden unless it is set
 CSV_FILENAME = "test_bank.csv" # Assumes the CSV is in the same directory
+HISTORY_FILENAME = "attempt_history.csv" # Graded answers are appended here after every submitted quiz
+HISTORY_FIELDS = ['timestamp', 'user', 'quiz_id', 'item_id', 'q_type', 'group', 'correct', 'mode']
+HISTORY_DTYPES = {'timestamp': str, 'user': str, 'quiz_id': str, 'item_id': str, 'q_type': str, 'group': str, 'correct': 'int64', 'mode': str}
+CALIBRATION_TTL_SECONDS = 600 # How long adaptive item parameters are reused before recalibrating
+DASHBOARD_TTL_SECONDS = 60 # How long cohort aggregates are reused before re-reading the history
+STANDARD_TYPES = quiz_bank.STANDARD_TYPES # Single-answer types; the only ones served in adaptive and drill modes
+EXAM_GRACE_SECONDS = 2 # Answers arriving this soon after the deadline still count (network latency)
+DRILL_BLOCK_SIZE = 20 # Questions sent to the browser at once in drill mode
+REVIEW_PAGE_SIZE = 10 # Questions per page on the results review
+REVIEW_STATUS_ICONS = {'correct': "✅", 'incorrect': "❌", 'partial': "🟨", 'unanswered': "❓", 'info': "📝"}
+STATE_DB_FILENAME = os.environ.get("QUIZ_STATE_DB", "quiz_sessions.db") # Session store for the workers of one host; local disk only, not a network volume
+STATE_FLUSH_SECONDS = 1.0 # Quiz state reaches the shared store at most this long after a change
+STATE_TTL_SECONDS = 7 * 24 * 3600 # Sessions untouched for this long are deleted from the shared store
+RENDER_CACHE_MAX_BYTES = 32 * 1024 * 1024 # Memory budget for pre-rendered questions shared by all sessions of a worker
+PREFETCH_WORKERS = 2 # Background threads per process that prepare each session's next quiz
+PREFETCH_MAX_PENDING = 256 # Prepared quizzes held per process; the oldest (abandoned sessions) are cancelled first
+EVENT_LOG_DIR = os.environ.get("QUIZ_EVENT_LOG_DIR", "event_logs") # Interaction events for replay (python quiz_events.py)
+EVENT_QUEUE_SIZE = 10000 # Events buffered per process before new ones are dropped rather than blocking the UI
+PERSISTED_STATE_KEYS = [ # Everything needed to resume a quiz on another worker (bank data is reloaded, not stored)
+    'user_name', 'selected_counts', 'selected_matching_groups', 'setup_complete', 'quiz_id', 'quiz_bank_version', 'quiz_pool',
+    'current_question_index', 'user_answers', 'flagged_questions', 'submitted', 'shuffled_mcq_options',
+    'matching_answers', 'shuffled_matching_definitions', 'learning_mode', 'verified_matching_questions',
+    'adaptive_mode', 'adaptive_max_items', 'adaptive_target_se', 'adaptive_item_ids',
+    'adaptive_log_posterior', 'adaptive_estimate', 'timed_mode', 'exam_minutes', 'exam_deadline',
+    'exam_auto_submitted', 'drill_mode', 'drill_block_index', 'drill_last_score', 'coverage_gap_mode',
+]
+COMPONENTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "components")
+
+# --- Custom Components ---
+# Counts down in the browser and reports back once at expiry, so timed exams cost no reruns per tick
+exam_timer = components.declare_component("exam_timer", path=os.path.join(COMPONENTS_DIR, "exam_timer"))
+# Answers a whole block of questions in the browser and returns every answer in one message
+drill_block = components.declare_component("drill_block", path=os.path.join(COMPONENTS_DIR, "drill"))
 
 # --- Air Force Theme Configuration (Basic) ---
 st.set_page_config(layout="wide")
@@ -25,137 +74,449 @@ except Exception as e:
     st.warning(f"Could not apply theme settings directly: {e}. Using defaults.")
 
 # --- Data Loading Function ---
-@st.cache_data(show_spinner=False) # Cache the loaded data
+@st.cache_resource(show_spinner=False) # One per process, reused across bank versions
+def get_bank_row_cache():
+    """Parsed rows from the previous load, so a bank edit only reprocesses the rows that changed."""
+    return threading.Lock(), {}  # The lock stops two sessions rewriting the cache at once
+
+@st.cache_data(max_entries=8, show_spinner=False) # The file is only rehashed when its size or mtime changes
+def bank_file_version(filename, mtime_ns, size):
+    """Content version of the bank file as it was at this mtime and size (None if it can't be read)."""
+    try:
+        return quiz_bank.file_version(filename)
+    except OSError:
+        return None
+
+def get_bank_version(filename):
+    """The content hash of the bank file, which identifies a version of the bank (None if missing).
+
+    Touching the file or serving the same bank from another host keeps the version, and every cache keyed on it.
+    """
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return bank_file_version(filename, stat.st_mtime_ns, stat.st_size)
+
 def load_and_process_questions(filename):
     """Loads questions and categorizes them by type and matching group."""
-    questions_by_type = defaultdict(list)
-    matching_groups = defaultdict(list)
-    all_questions_list = []
-    
+    return load_bank_version(filename, get_bank_version(filename))
+
+@st.cache_data(max_entries=2, show_spinner=False) # Cache the loaded data; new content means a new bank version
+def load_bank_version(filename, bank_version):
+    """Parses one version of the bank, reusing already parsed rows.
+
+    Raises quiz_bank.BankChangedError (so nothing is cached) if the file no longer holds `bank_version`.
+    """
+    lock, row_cache = get_bank_row_cache()
     try:
-        # Simple CSV reading approach without pandas to reduce complexity
-        with open(filename, 'r', encoding='utf-8') as csvfile:
-            reader = csv.reader(csvfile)
-            headers = next(reader, None)  # Get headers
-            
-            # Map column indices based on the provided headers
-            # Default mappings based on your header: Type,Question,CorrectAnswer,Distractor1,Distractor2,Distractor3,Explanation
-            type_idx = 0  # 'Type' column
-            question_idx = 1  # 'Question' column
-            answer_idx = 2  # 'CorrectAnswer' column
-            exp_idx = 6  # 'Explanation' column
-            
-            # For MCQ, record distractor columns
-            distractor_indices = [3, 4, 5]  # 'Distractor1', 'Distractor2', 'Distractor3'
-            
-            # Process rows
-            row_index = 0
-            for row in reader:
-                if not row or len(row) < 3:  # Skip rows with insufficient data
-                    continue
-                
-                try:
-                    q_type = row[type_idx].strip() if type_idx < len(row) else ''
-                    
-                    if q_type.lower() == 'matching':
-                        # Handle matching question
-                        question_text = row[question_idx].strip() if question_idx < len(row) else ''
-                        
-                        # Extract the group name from the question 
-                        # Assuming format: "Match terms for group: [Group Name]" or just the group name
-                        group = ''
-                        if ":" in question_text:
-                            parts = question_text.split(":", 1)
-                            if len(parts) > 1:
-                                group = parts[1].strip()
-                            else:
-                                group = question_text.strip()
-                        else:
-                            group = question_text.strip()
-                        
-                        # For matching questions, the term will be in the term_idx column (CorrectAnswer in this case)
-                        term = row[answer_idx].strip() if answer_idx < len(row) else ''
-                        
-                        # For matching, we need definitions - these would be in the distractor columns
-                        definition = ''
-                        for idx in distractor_indices:
-                            if idx < len(row) and row[idx].strip():
-                                definition = row[idx].strip()
-                                break
-                        
-                        explanation = row[exp_idx].strip() if exp_idx < len(row) and len(row) > exp_idx else ''
-                        
-                        if group and term:
-                            # Create question dict with all required fields
-                            question_dict = {
-                                'Type': 'Matching',
-                                'Group': group,
-                                'Term': term,              # This is the abbreviation (left side)
-                                'Question': question_text, # Original question text
-                                'Definition': definition,  # This is the explanation (right side)
-                                'CorrectAnswer': definition,  # For grading consistency
-                                'Explanation': explanation,
-                                'original_index': row_index
-                            }
-                            
-                            # Add to collections
-                            matching_groups[group].append(question_dict)
-                            questions_by_type['Matching'].append(question_dict)
-                            all_questions_list.append(question_dict)
-                            row_index += 1
-                    
-                    elif q_type in ['MCQ', 'TF', 'FillBlank']:
-                        # Handle other question types
-                        question = row[question_idx].strip() if question_idx < len(row) else ''
-                        answer = row[answer_idx].strip() if answer_idx < len(row) else ''
-                        explanation = row[exp_idx].strip() if exp_idx < len(row) and len(row) > exp_idx else ''
-                        
-                        # Create basic question dictionary
-                        question_dict = {
-                            'Type': q_type,
-                            'Question': question,
-                            'CorrectAnswer': answer,
-                            'Explanation': explanation,
-                            'original_index': row_index
-                        }
-                        
-                        # Handle type-specific processing
-                        if q_type == 'MCQ':
-                            # Get distractors from specified columns
-                            distractors = []
-                            for idx in distractor_indices:
-                                if idx < len(row) and row[idx].strip():
-                                    distractors.append(row[idx].strip())
-                            
-                            question_dict['Distractors'] = distractors
-                        
-                        elif q_type == 'TF':
-                            # Convert to boolean
-                            question_dict['CorrectAnswer'] = answer.lower() == 'true'
-                        
-                        # Add to collections
-                        questions_by_type[q_type].append(question_dict)
-                        all_questions_list.append(question_dict)
-                        row_index += 1
-                except Exception as row_error:
-                    # Skip problematic rows but continue processing
-                    pass
-    
+        with lock:
+            parsed = quiz_bank.parse_question_bank(filename, row_cache=row_cache)
+        if quiz_bank.file_version(filename) != bank_version:
+            raise quiz_bank.BankChangedError(f"'{filename}' changed while it was being loaded; reload the page.")
+        return parsed
+
+    except quiz_bank.BankChangedError:
+        raise
+
     except FileNotFoundError:
         st.error(f"Error: File '{filename}' not found. Please ensure the file '{filename}' is in the same directory as your app.")
-        empty_result = (dict(questions_by_type), dict(matching_groups), all_questions_list)
-        return empty_result  # Return empty collections
-        
+        return {}, {}, []  # Return empty collections
+
     except Exception as e:
         # Log error but return empty collections
         st.error(f"Error reading CSV: {str(e)}")
         st.error(f"Make sure '{filename}' is a valid CSV file with the correct format.")
-        empty_result = (dict(questions_by_type), dict(matching_groups), all_questions_list)
-        return empty_result  # Return empty collections
+        return {}, {}, []  # Return empty collections
+
+@st.cache_data(max_entries=2, show_spinner=False) # One bundle per recent bank version, shared by every download
+def build_self_study_export(filename, bank_version):
+    """Returns the offline self-study page for one version of the bank."""
+    questions_by_type, matching_groups, _ = load_bank_version(filename, bank_version)
+    return quiz_export.build_static_bundle(questions_by_type, matching_groups)
+
+# --- Attempt History ---
+def load_attempt_history(filename):
+    """Loads recorded attempts as a DataFrame (empty if nothing has been recorded yet)."""
+    if not os.path.exists(filename):
+        return pd.DataFrame(columns=HISTORY_FIELDS)
+    try:
+        attempts = pd.read_csv(filename, dtype=HISTORY_DTYPES, keep_default_na=False)
+    except (OSError, pd.errors.ParserError, pd.errors.EmptyDataError):
+        return pd.DataFrame(columns=HISTORY_FIELDS)
+    if 'mode' not in attempts:
+        attempts['mode'] = ''  # Recorded before quiz modes were; unknown
+    return attempts
+
+def upgrade_history_file(filename):
+    """Rewrites a history file recorded with older columns so new rows can be appended under HISTORY_FIELDS."""
+    with open(filename, newline='', encoding='utf-8') as history_file:
+        header = next(csv.reader(history_file), None)
+    if header is None or header == HISTORY_FIELDS:
+        return
+    attempts = pd.read_csv(filename, dtype=str, keep_default_na=False).reindex(columns=HISTORY_FIELDS, fill_value='')
+    attempts.to_csv(filename, index=False)
+
+def quiz_mode():
+    """Label of the mode the current quiz runs in, recorded with each attempt."""
+    for mode in ('adaptive', 'drill', 'timed', 'learning'):
+        if st.session_state.get(f'{mode}_mode'):
+            return mode
+    return 'standard'
+
+def summarize_attempts(attempts, by):
+    """Groups attempts by one column and returns answer counts and accuracy per value."""
+    summary = attempts.groupby(by, sort=False).agg(
+        trainees=('user', 'nunique'), answers=('correct', 'size'), correct=('correct', 'sum')
+    )
+    summary['accuracy'] = summary['correct'] / summary['answers']
+    return summary.sort_values('accuracy').reset_index()
+
+@st.cache_data(ttl=DASHBOARD_TTL_SECONDS, show_spinner=False) # Shared by every instructor viewing the dashboard
+def load_cohort_summary(history_filename, bank_filename):
+    """Aggregates the attempt history by trainee, question type, matching group and cited page."""
+    attempts = load_attempt_history(history_filename)
+    if attempts.empty:
+        return None
+
+    # Cited pages come from the bank explanation ("Page 39 states ..."); an answer counts for every page its item cites
+    page_index = load_page_index(bank_filename, get_bank_version(bank_filename))
+    page_attempts = attempts[['user', 'item_id', 'correct']].merge(page_index.item_pages(), on='item_id')
+
+    by_user = attempts.groupby('user', sort=False).agg(
+        quizzes=('quiz_id', 'nunique'), answers=('correct', 'size'),
+        correct=('correct', 'sum'), last_active=('timestamp', 'max')
+    )
+    by_user['accuracy'] = by_user['correct'] / by_user['answers']
+
+    return {
+        'trainees': attempts['user'].nunique(),
+        'quizzes': attempts['quiz_id'].nunique(),
+        'answers': len(attempts),
+        'accuracy': attempts['correct'].mean(),
+        'by_user': by_user.sort_values('last_active', ascending=False).reset_index(),
+        'by_type': summarize_attempts(attempts, 'q_type'),
+        'by_group': summarize_attempts(attempts[attempts['group'] != ''], 'group'),
+        'by_page': summarize_attempts(page_attempts, 'page'),
+    }
+
+def record_attempts():
+    """Appends one row per answered item (matching terms count individually) to the history file; returns the rows."""
+    timestamp = datetime.now(timezone.utc).isoformat()
+    user = st.session_state.get('user_name', '').strip() or 'anonymous'
+    quiz_id = st.session_state.get('quiz_id', '')
+    mode = quiz_mode()
+    rows = []
+
+    for i, q_data in enumerate(st.session_state.quiz_pool):
+        user_answer = st.session_state.user_answers.get(i)
+        q_type = q_data.get('Type')
 
-    # Always return a valid tuple of results
-    return dict(questions_by_type), dict(matching_groups), all_questions_list
+        if q_type in STANDARD_TYPES and user_answer is not None:
+            rows.append([timestamp, user, quiz_id, q_data.get('id'), q_type, '',
+                         int(quiz_bank.is_answer_correct(q_data, user_answer)), mode])
+        elif q_type == "MatchingGroup" and user_answer:
+            for term_idx, term_data in enumerate(q_data.get('MatchingTerms', [])):
+                if term_idx in user_answer:
+                    is_match_correct = quiz_bank.is_match_correct(user_answer[term_idx], term_data.get('Definition', ''))
+                    rows.append([timestamp, user, quiz_id, term_data.get('id'), 'Matching',
+                                 q_data.get('Group', ''), int(is_match_correct), mode])
+
+    if not rows:
+        return rows
+    try:
+        write_header = not os.path.exists(HISTORY_FILENAME)
+        if not write_header:
+            upgrade_history_file(HISTORY_FILENAME)
+        with open(HISTORY_FILENAME, 'a', newline='', encoding='utf-8') as history_file:
+            writer = csv.writer(history_file)
+            if write_header:
+                writer.writerow(HISTORY_FIELDS)
+            writer.writerows(rows)
+    except OSError as e:
+        st.warning(f"Could not save attempt history: {e}")
+    return rows
+
+# --- Source Coverage ---
+@st.cache_resource(max_entries=2, show_spinner=False) # Built once per bank version, shared by all sessions
+def load_page_index(filename, bank_version):
+    """Indexes the questions of one bank version by the source pages their explanations cite."""
+    _, _, all_questions = load_bank_version(filename, bank_version)
+    return quiz_coverage.PageIndex(all_questions)
+
+@st.cache_resource(show_spinner=False) # One connection factory per process
+def get_coverage_store():
+    """Returns the per-user page coverage store (kept alongside the session store)."""
+    return quiz_coverage.SQLiteCoverageStore(STATE_DB_FILENAME)
+
+def get_page_coverage():
+    """Returns the trainee's {page: [answered, correct]}, loaded from the store once per session and name."""
+    user = st.session_state.user_name.strip()
+    if st.session_state.page_coverage_user != user:
+        coverage = {}
+        if user:
+            try:
+                coverage = get_coverage_store().load(user)
+            except Exception as e:
+                st.warning(f"Could not load your coverage: {e}")
+        st.session_state.page_coverage = coverage
+        st.session_state.page_coverage_user = user
+    return st.session_state.page_coverage
+
+def update_page_coverage(graded_rows):
+    """Adds a graded quiz's history rows to the trainee's page counters, in this session and in the store."""
+    user = st.session_state.user_name.strip()
+    if not user or not graded_rows:
+        return
+    page_index = load_page_index(CSV_FILENAME, get_bank_version(CSV_FILENAME))  # Items are looked up by stable id, so the current version serves any quiz
+    item_col, correct_col = HISTORY_FIELDS.index('item_id'), HISTORY_FIELDS.index('correct')
+    delta = page_index.coverage_delta([(row[item_col], row[correct_col]) for row in graded_rows])
+    if not delta:
+        return
 
+    coverage = get_page_coverage()
+    for page, (answered, correct) in delta.items():
+        counts = coverage.setdefault(page, [0, 0])
+        counts[0] += answered
+        counts[1] += correct
+    try:
+        get_coverage_store().add(user, delta)
+    except Exception as e:
+        st.warning(f"Could not save your coverage: {e}")
+
+def build_gap_quiz_pool(page_index, coverage, questions_by_type, matching_groups, selected_counts, selected_groups):
+    """Like quiz_bank.build_quiz_pool, but draws the standard questions from the trainee's weakest pages."""
+    pool = quiz_bank.build_quiz_pool(questions_by_type, matching_groups, {}, selected_groups)
+
+    for q_type in STANDARD_TYPES:
+        # Drawn from the page index only; it tops up from uncited questions once the cited ones run out
+        pool.extend(page_index.sample_gaps(coverage, q_type, selected_counts.get(q_type, 0)))
+
+    random.shuffle(pool)
+    return pool
+
+# --- Next Quiz Precomputation ---
+@st.cache_resource(show_spinner=False) # One bounded worker pool per process
+def get_quiz_prefetcher():
+    """Returns the process-wide pool that prepares each session's next quiz in the background."""
+    return quiz_prefetch.QuizPrefetcher(max_workers=PREFETCH_WORKERS, max_pending=PREFETCH_MAX_PENDING)
+
+def capture_quiz_settings():
+    """Snapshots what a new (non-adaptive) quiz depends on, so it can be built off the script thread.
+
+    Returns (signature, inputs); quizzes built from equal signatures are interchangeable.
+    """
+    gap_mode = st.session_state.coverage_gap_mode
+    coverage = {page: tuple(counts) for page, counts in get_page_coverage().items()} if gap_mode else {}
+    inputs = {
+        'bank_version': st.session_state.bank_version,
+        'questions_by_type': st.session_state.questions_by_type,
+        'matching_groups': st.session_state.matching_groups_data,
+        'selected_counts': dict(st.session_state.selected_counts),
+        'selected_groups': list(st.session_state.get('selected_matching_groups', [])),
+        'drill_mode': st.session_state.drill_mode,
+        'page_index': load_page_index(CSV_FILENAME, get_bank_version(CSV_FILENAME)) if gap_mode else None,
+        'coverage': coverage,
+        'render_cache': get_render_cache(),
+    }
+    signature = (
+        inputs['bank_version'], tuple(sorted(inputs['selected_counts'].items())), tuple(inputs['selected_groups']),
+        inputs['drill_mode'], gap_mode, st.session_state.user_name.strip() if gap_mode else '',
+        sum(answered for answered, _ in coverage.values()),  # Changes after every graded quiz
+    )
+    return signature, inputs
+
+def prepare_quiz(inputs, cancelled=None):
+    """Samples a quiz, renders its questions and shuffles their options; safe to run on a worker thread.
+
+    Returns {'quiz_pool', 'shuffled_mcq_options', 'shuffled_matching_definitions'}, or None once `cancelled` is set.
+    """
+    if inputs['page_index'] is not None:
+        pool = build_gap_quiz_pool(
+            inputs['page_index'], inputs['coverage'], inputs['questions_by_type'], inputs['matching_groups'],
+            inputs['selected_counts'], inputs['selected_groups']
+        )
+    else:
+        pool = quiz_bank.build_quiz_pool(
+            inputs['questions_by_type'], inputs['matching_groups'], inputs['selected_counts'], inputs['selected_groups']
+        )
+
+    if inputs['drill_mode']:
+        # Drill blocks are answered in the browser, which only supports one-answer questions
+        pool = [q for q in pool if q.get('Type') in STANDARD_TYPES]
+
+    shuffled_mcq_options = {}
+    shuffled_matching_definitions = {}
+    for i, q_data in enumerate(pool):
+        if cancelled is not None and cancelled.is_set():
+            return None
+        static_parts = inputs['render_cache'].get_question(q_data, inputs['bank_version'])
+        if q_data.get('Type') == 'MCQ':
+            shuffled_mcq_options[i] = random.sample(static_parts['options'], len(static_parts['options']))
+        elif q_data.get('Type') == 'MatchingGroup':
+            shuffled_matching_definitions[i] = random.sample(static_parts['definitions'], len(static_parts['definitions']))
+
+    return {
+        'quiz_pool': pool,
+        'shuffled_mcq_options': shuffled_mcq_options,
+        'shuffled_matching_definitions': shuffled_matching_definitions,
+    }
+
+def prefetch_next_quiz():
+    """Starts preparing the quiz the current settings would start, so Start Quiz only has to swap it in."""
+    prefetcher = get_quiz_prefetcher()
+    if st.session_state.adaptive_mode or not (
+        any(st.session_state.selected_counts.values()) or st.session_state.selected_matching_groups
+    ):
+        prefetcher.cancel(st.session_state.session_id)  # Adaptive quizzes are built one item at a time
+        return
+    signature, inputs = capture_quiz_settings()
+    prefetcher.prefetch(st.session_state.session_id, signature, lambda cancelled: prepare_quiz(inputs, cancelled))
+
+# --- Adaptive Testing ---
+@st.cache_resource(ttl=CALIBRATION_TTL_SECONDS, max_entries=2, show_spinner=False) # Shared by all sessions, recalibrated periodically
+def load_adaptive_index(filename, bank_version):
+    """Calibrates standard questions of one bank version and builds the item-information index.
+
+    Returns (items, index, positions) where positions maps an item id to its row in the index.
+    """
+    questions_by_type, _, _ = load_bank_version(filename, bank_version)
+    items = [q for q_type in STANDARD_TYPES for q in questions_by_type.get(q_type, [])]
+    a, b = quiz_adaptive.calibrate_items(items, load_attempt_history(HISTORY_FILENAME))
+    return items, quiz_adaptive.ItemInformationIndex(a, b), {q['id']: i for i, q in enumerate(items)}
+
+def start_adaptive_quiz():
+    """Starts an adaptive quiz with the most informative item for an average trainee."""
+    items, index, _ = load_adaptive_index(CSV_FILENAME, get_bank_version(CSV_FILENAME))
+    if not len(index):
+        st.warning("No MCQ, TF or FillBlank questions are available for adaptive mode.")
+        return False
+
+    st.session_state.adaptive_log_posterior = quiz_adaptive.initial_log_posterior()
+    theta, se = quiz_adaptive.estimate_ability(st.session_state.adaptive_log_posterior)
+    first_item = items[index.select(theta, set())]
+    st.session_state.adaptive_item_ids = [first_item['id']]
+    st.session_state.adaptive_estimate = (theta, se)
+    st.session_state.quiz_pool = [first_item]
+    return True
+
+def advance_adaptive_quiz(q_idx_pool):
+    """Scores the current answer, updates the ability estimate, then stops or serves the next item."""
+    # Grade the question the trainee saw; the bank may have been edited or recalibrated since it was served,
+    # so parameters and the next item come from the current version, looked up by stable id
+    items, index, positions = load_adaptive_index(CSV_FILENAME, get_bank_version(CSV_FILENAME))
+    q_data = st.session_state.quiz_pool[q_idx_pool]
+    correct = quiz_bank.is_answer_correct(q_data, st.session_state.user_answers.get(q_idx_pool))
+
+    item_pos = positions.get(q_data.get('id'))
+    if item_pos is None:  # Edited out of the bank since it was served
+        a, b = quiz_adaptive.default_parameters(q_data.get('Type'))
+    else:
+        a, b = index.a[item_pos], index.b[item_pos]
+    st.session_state.adaptive_log_posterior = quiz_adaptive.update_log_posterior(
+        st.session_state.adaptive_log_posterior, a, b, correct
+    )
+    theta, se = quiz_adaptive.estimate_ability(st.session_state.adaptive_log_posterior)
+    st.session_state.adaptive_estimate = (theta, se)
+
+    administered = st.session_state.adaptive_item_ids
+    if quiz_adaptive.should_stop(se, len(administered), st.session_state.adaptive_max_items,
+                                 st.session_state.adaptive_target_se):
+        submit_quiz()
+        return
+
+    next_pos = index.select(theta, {positions[item_id] for item_id in administered if item_id in positions})
+    if next_pos is None:  # Bank exhausted
+        submit_quiz()
+        return
+
+    next_item = items[next_pos]
+    administered.append(next_item['id'])
+    st.session_state.quiz_pool.append(next_item)
+    new_index = len(st.session_state.quiz_pool) - 1
+    st.session_state.user_answers[new_index] = None
+    st.session_state.flagged_questions[new_index] = False
+    st.session_state.current_question_index = new_index
+    log_event('navigate', new_index, source='adaptive')
+
+
+# --- Shared Session Store ---
+@st.cache_resource(show_spinner=False) # One write-behind cache per process
+def get_state_store():
+    """Returns the process-wide cache in front of the shared session store."""
+    return quiz_state.WriteBehindCache(
+        quiz_state.SQLiteStateBackend(STATE_DB_FILENAME), flush_interval=STATE_FLUSH_SECONDS, session_ttl=STATE_TTL_SECONDS
+    )
+
+def restore_session_state():
+    """Ties this browser session to a session id in the URL and reloads its stored quiz state, if any.
+
+    Runs after init_session_state so the stored values replace the defaults rather than the other way round.
+    """
+    if 'session_id' in st.session_state:
+        return  # Already attached; reruns read from st.session_state only
+
+    session_id = st.query_params.get("session")
+    if not session_id:
+        session_id = uuid.uuid4().hex
+        st.query_params["session"] = session_id  # Reloading or reconnecting to any worker resumes this session
+    st.session_state.session_id = session_id
+
+    try:
+        stored_state = get_state_store().get(session_id)
+    except Exception as e:
+        st.warning(f"Could not restore your saved quiz: {e}")
+        return
+    for key, value in (stored_state or {}).items():
+        if key in PERSISTED_STATE_KEYS:
+            st.session_state[key] = value
+
+    # Setup selections from an older bank version must still fit the one loaded now
+    st.session_state.selected_counts = {
+        q_type: min(st.session_state.selected_counts.get(q_type, 0), available)
+        for q_type, available in st.session_state.available_counts.items()
+    }
+    st.session_state.selected_matching_groups = [
+        group for group in st.session_state.selected_matching_groups if group in st.session_state.matching_groups_data
+    ]
+
+def persist_session_state():
+    """Hands the current quiz state to the write-behind cache (written to the store in the background)."""
+    state = {key: st.session_state[key] for key in PERSISTED_STATE_KEYS if key in st.session_state}
+    get_state_store().put(st.session_state.session_id, state)
+
+# --- Question Render Cache ---
+@st.cache_resource(show_spinner=False) # One per process, shared by every session
+def get_render_cache():
+    """Returns the process-wide cache of pre-rendered question parts."""
+    return quiz_render.RenderCache(max_bytes=RENDER_CACHE_MAX_BYTES)
+
+def rendered_question(question_data):
+    """Returns the static parts of a question, rendering them only on the first request per bank version."""
+    return get_render_cache().get_question(question_data, st.session_state.quiz_bank_version)
+
+# --- Interaction Event Log ---
+@st.cache_resource(show_spinner=False) # One writer thread per process
+def get_event_log():
+    """Returns the process-wide buffered event log."""
+    return quiz_events.EventLog(EVENT_LOG_DIR, max_queue=EVENT_QUEUE_SIZE)
+
+def log_event(event, q_idx_pool=None, **fields):
+    """Queues one interaction event with the session, quiz and stable question id; never waits on disk."""
+    record = {'event': event, 'session': st.session_state.get('session_id'), 'quiz': st.session_state.get('quiz_id')}
+    if q_idx_pool is not None:
+        record['q'] = q_idx_pool
+        if q_idx_pool < len(st.session_state.quiz_pool):
+            record['item'] = st.session_state.quiz_pool[q_idx_pool].get('id')
+    record.update(fields)
+    get_event_log().emit(record)
+
+def set_answer(q_idx_pool, answer, source):
+    """Stores an answer and logs it when it changed; every write to user_answers goes through here."""
+    if q_idx_pool in st.session_state.user_answers and st.session_state.user_answers[q_idx_pool] == answer:
+        return
+    st.session_state.user_answers[q_idx_pool] = answer
+    log_event('answer_set', q_idx_pool, value=answer, source=source)
 
 # --- Initialize Session State ---
 def init_session_state():
@@ -262,63 +623,72 @@ def check_login():
             st.error("Incorrect password.")
         st.session_state.logged_in = False
 
+def get_instructor_password():
+    """The instructor password from st.secrets (or QUIZ_INSTRUCTOR_PASSWORD), or None when none is configured."""
+    try:
+        password = st.secrets.get(INSTRUCTOR_PASSWORD_SECRET)
+    except Exception:  # No secrets file
+        password = None
+    return password or os.environ.get("QUIZ_INSTRUCTOR_PASSWORD") or None
+
+def check_instructor_login():
+    """Unlocks the cohort dashboard for this session when the instructor password matches."""
+    password = get_instructor_password()
+    attempt = st.session_state.instructor_password_attempt
+    st.session_state.instructor_password_attempt = ""  # Clear password attempt
+    if password and hmac.compare_digest(attempt.encode('utf-8'), password.encode('utf-8')):
+        st.session_state.instructor_unlocked = True
+        st.session_state.show_dashboard = True
+    elif attempt:
+        st.session_state.instructor_login_failed = True
+
 def start_quiz():
     """Builds the quiz pool based on selected counts and groups, marks setup complete."""
-    final_pool = []
-
-    # Add MCQ, TF, FillBlank based on counts
-    for q_type, questions in st.session_state.questions_by_type.items():
-        if q_type == 'Matching': continue  # Handle matching separately
-
-        count = st.session_state.selected_counts.get(q_type, 0)
-        num_available = len(questions)
-        actual_count = min(count, num_available)  # Ensure we don't request more than available
-
-        if actual_count > 0:
-            final_pool.extend(random.sample(questions, actual_count))
-
-    # Add selected Matching groups as consolidated group questions (one per group)
-    selected_groups = st.session_state.get('selected_matching_groups', [])
-    for group_name in selected_groups:
-        if group_name in st.session_state.matching_groups_data:
-            # Get all terms for this group
-            group_terms = st.session_state.matching_groups_data[group_name]
-            
-            if group_terms:
-                # Create a single question object that represents the entire matching group
-                matching_question = {
-                    'Type': 'MatchingGroup',  # Different type to distinguish from individual matching items
-                    'Group': group_name,
-                    'Question': f"Match the following terms for: {group_name}",
-                    'MatchingTerms': group_terms,  # Store all terms in this group
-                    'TermCount': len(group_terms)
-                }
-                
-                # Add just one question object for the entire group
-                final_pool.append(matching_question)
+    if st.session_state.adaptive_mode:
+        # Adaptive quizzes start with a single item and grow as questions are answered
+        if not start_adaptive_quiz():
+            return
+        final_pool = st.session_state.quiz_pool
+        prepared = None
+    else:
+        # Normally already built in the background while the setup or results page was shown
+        signature, inputs = capture_quiz_settings()
+        prepared = get_quiz_prefetcher().take(st.session_state.session_id, signature) or prepare_quiz(inputs)
+        final_pool = prepared['quiz_pool']
 
     if not final_pool:
         st.warning("No questions selected. Please select at least one question or matching group.")
         return  # Don't start quiz if pool is empty
 
-    random.shuffle(final_pool)  # Shuffle the order of questions
     st.session_state.quiz_pool = final_pool
+    st.session_state.quiz_id = uuid.uuid4().hex  # Groups this quiz's answers in the attempt history
+    st.session_state.quiz_bank_version = st.session_state.bank_version  # Pool content stays on this version
+    st.session_state.exam_deadline = time.time() + st.session_state.exam_minutes * 60 if st.session_state.timed_mode else None
+    st.session_state.exam_auto_submitted = False
+    st.session_state.drill_block_index = 0
+    st.session_state.drill_last_score = None
 
     # Reset quiz state variables based on the new pool
     st.session_state.current_question_index = 0
     st.session_state.user_answers = {i: None for i in range(len(final_pool))}
     st.session_state.flagged_questions = {i: False for i in range(len(final_pool))}
     st.session_state.submitted = False
-    st.session_state.shuffled_mcq_options = {}  # Reset shuffled options
+    st.session_state.shuffled_mcq_options = prepared['shuffled_mcq_options'] if prepared else {}
+    st.session_state.shuffled_matching_definitions = prepared['shuffled_matching_definitions'] if prepared else {}
     
     # Add a new state variable for matching answers
     st.session_state.matching_answers = {}  # Will store {question_idx: {term_idx: selected_definition_idx}}
 
     st.session_state.setup_complete = True  # Mark setup as done
+    log_event('start', items=[q.get('id') for q in final_pool], adaptive=st.session_state.adaptive_mode,
+              drill=st.session_state.drill_mode, timed=st.session_state.timed_mode, learning=st.session_state.learning_mode)
 
 def save_answer(q_idx_pool):
     """Saves the selected answer for the current question index in the quiz_pool."""
     if not st.session_state.quiz_pool or q_idx_pool >= len(st.session_state.quiz_pool): return
+    if exam_time_expired(EXAM_GRACE_SECONDS):
+        submit_quiz()  # Late answers are discarded and the exam is closed
+        return
     q_data = st.session_state.quiz_pool[q_idx_pool]
     q_type = q_data.get('Type')
     widget_key = f"q_{q_idx_pool}" # Key for the input widget
@@ -327,22 +697,40 @@ def save_answer(q_idx_pool):
         answer = st.session_state[widget_key]
         # Store answer appropriately (e.g., boolean for TF)
         if q_type == "TF":
-            st.session_state.user_answers[q_idx_pool] = (answer == "True") # Store as bool
+            set_answer(q_idx_pool, answer == "True", 'widget') # Store as bool
         else:
-            st.session_state.user_answers[q_idx_pool] = answer # Store string/other
+            set_answer(q_idx_pool, answer, 'widget') # Store string/other
 
 def toggle_flag(q_idx_pool):
     """Toggles the flag status for the current question index in the quiz_pool without navigating."""
     current_flag_status = st.session_state.flagged_questions.get(q_idx_pool, False)
     st.session_state.flagged_questions[q_idx_pool] = not current_flag_status
+    log_event('flag', q_idx_pool, value=not current_flag_status)
 
 def navigate_question(new_index_pool):
     """Sets the current question index in the quiz_pool."""
     if 0 <= new_index_pool < len(st.session_state.quiz_pool):
         st.session_state.current_question_index = new_index_pool
+        log_event('navigate', new_index_pool)
+
+def exam_seconds_remaining():
+    """Seconds left in a timed exam, or None when the quiz is untimed."""
+    if st.session_state.exam_deadline is None:
+        return None
+    return max(0.0, st.session_state.exam_deadline - time.time())
+
+def exam_time_expired(grace_seconds=0):
+    """True once a timed exam is past its deadline (plus an optional grace period)."""
+    if st.session_state.exam_deadline is None:
+        return False
+    return time.time() > st.session_state.exam_deadline + grace_seconds
 
 def submit_quiz():
-    """Sets the submission flag."""
+    """Sets the submission flag and records the graded answers in the attempt history."""
+    if not st.session_state.submitted:
+        st.session_state.exam_auto_submitted = exam_time_expired()
+        update_page_coverage(record_attempts())
+        log_event('submit', auto=st.session_state.exam_auto_submitted)
     st.session_state.submitted = True
 
 # --- Display Functions ---
@@ -353,6 +741,13 @@ def display_login():
 
 def display_setup_screen():
     st.title("Quiz Setup")
+    st.session_state.user_name = st.text_input(
+        "Trainee Name", value=st.session_state.user_name,
+        help="Recorded with your results so instructors can follow your progress."
+    )
+    if st.session_state.user_name.strip():
+        with st.expander("My Source Coverage"):
+            display_coverage_summary()
     st.write("Select the number of questions for each type:")
 
     # --- Number Input for Standard Types ---
@@ -400,29 +795,133 @@ def display_setup_screen():
         value=st.session_state.learning_mode,
         help="When enabled, you can check your answers immediately and see explanations during the quiz."
     )
+    st.session_state.adaptive_mode = st.checkbox(
+        "Adaptive Mode (Questions adjust to your ability)",
+        value=st.session_state.adaptive_mode,
+        help="Picks each MCQ/TF/FillBlank question based on your previous answers and stops once your score is measured precisely. Counts and matching groups above are ignored."
+    )
+    if st.session_state.adaptive_mode:
+        adaptive_cols = st.columns(2)
+        with adaptive_cols[0]:
+            st.session_state.adaptive_max_items = st.number_input(
+                "Maximum Questions", min_value=5, max_value=quiz_adaptive.TABLE_DEPTH,
+                value=st.session_state.adaptive_max_items, key="select_adaptive_max_items"
+            )
+        with adaptive_cols[1]:
+            st.session_state.adaptive_target_se = st.number_input(
+                "Precision Target (standard error)", min_value=0.2, max_value=1.0, step=0.05,
+                value=st.session_state.adaptive_target_se, key="select_adaptive_target_se",
+                help="Lower values give a more precise score but longer quizzes."
+            )
+    st.session_state.coverage_gap_mode = st.checkbox(
+        "Fill My Coverage Gaps (Questions from pages you have missed or struggled with)",
+        value=st.session_state.coverage_gap_mode,
+        help="Draws the MCQ/TF/FillBlank counts above from the source pages you have answered least often or least accurately. Enter your name to track coverage across quizzes."
+    )
+    st.session_state.drill_mode = st.checkbox(
+        f"Drill Mode (Rapid-fire blocks of {DRILL_BLOCK_SIZE} with keyboard shortcuts)",
+        value=st.session_state.drill_mode,
+        help="Answers a whole block in your browser and grades it in one step. Only MCQ, TF and FillBlank questions are included."
+    )
+    st.session_state.timed_mode = st.checkbox(
+        "Timed Exam (Submits automatically when time runs out)",
+        value=st.session_state.timed_mode
+    )
+    if st.session_state.timed_mode:
+        st.session_state.exam_minutes = st.number_input(
+            "Time Limit (minutes)", min_value=1, max_value=240,
+            value=st.session_state.exam_minutes, key="select_exam_minutes"
+        )
 
     # Calculate total questions dynamically
     total_standard = sum(st.session_state.selected_counts.values())
     total_matching = sum(len(st.session_state.matching_groups_data[g]) for g in st.session_state.selected_matching_groups)
     total_selected = total_standard + total_matching
 
-    st.write(f"**Total Questions Selected: {total_selected}** ({total_standard} Standard + {total_matching} Matching)")
+    if st.session_state.adaptive_mode:
+        st.write(f"**Adaptive Quiz:** up to {st.session_state.adaptive_max_items} questions")
+    else:
+        st.write(f"**Total Questions Selected: {total_selected}** ({total_standard} Standard + {total_matching} Matching)")
 
-    if st.button("Start Quiz", type="primary", disabled=(total_selected == 0)):
+    prefetch_next_quiz()  # Settings are final for this run; build the quiz they describe in the background
+    if st.button("Start Quiz", type="primary", disabled=(total_selected == 0 and not st.session_state.adaptive_mode)):
         start_quiz()
         st.rerun() # Rerun to move to the quiz display
 
+    st.divider()
+    st.download_button(
+        "Download Offline Self-Study Version", build_self_study_export(CSV_FILENAME, get_bank_version(CSV_FILENAME)),
+        file_name="self_study.html", mime="text/html",
+        help="A single HTML file that runs practice quizzes in any browser, without this server."
+    )
+    # Trainees never see other trainees' results; the dashboard needs the instructor password
+    if not get_instructor_password():
+        return
+    if st.session_state.instructor_unlocked:
+        if st.button("Cohort Dashboard", help="Instructor view of recorded results across all trainees."):
+            st.session_state.show_dashboard = True
+            st.rerun()
+    else:
+        with st.expander("Instructor Access"):
+            st.text_input("Instructor Password", type="password", key="instructor_password_attempt", on_change=check_instructor_login)
+            if st.session_state.pop('instructor_login_failed', False):
+                st.error("Incorrect instructor password.")
+
+def display_coverage_summary():
+    """Shows which source pages the trainee has covered, biggest gaps first."""
+    page_index = load_page_index(CSV_FILENAME, get_bank_version(CSV_FILENAME))
+    if not len(page_index):
+        st.write("No explanations in this bank cite source pages.")
+        return
+    coverage = get_page_coverage()
+    covered = sum(1 for page in page_index.pages if coverage.get(page, (0, 0))[0])
+    st.write(f"**{covered} of {len(page_index)} cited pages covered**")
+    st.progress(covered / len(page_index))
+
+    rows = []
+    for page in page_index.rank_pages(coverage):
+        answered, correct = coverage.get(page, (0, 0))
+        rows.append({
+            'page': page, 'questions': page_index.question_count(page), 'answered': answered,
+            'accuracy': correct / answered if answered else None,
+            'cites': ", ".join(str(cite) for cite in sorted(page_index.cites_by_page[page])),
+        })
+    st.dataframe(pd.DataFrame(rows), hide_index=True, width="stretch", column_config={
+        'accuracy': st.column_config.ProgressColumn("Accuracy", format="percent", min_value=0, max_value=1)
+    })
+
 def check_answer(q_idx_pool):
     """Marks the current question as checked for Learning Mode."""
     if not st.session_state.learning_mode:
         return
     
     st.session_state.checked_answers[q_idx_pool] = True
+    log_event('check', q_idx_pool)
 
 def display_sidebar_quiz():
     st.sidebar.title("Questions")
+    remaining = exam_seconds_remaining()
+    if remaining is not None:
+        with st.sidebar:
+            # The returned value only signals expiry; the deadline itself is checked on the server
+            exam_timer(remaining_seconds=remaining, key=f"exam_timer_{st.session_state.quiz_id}", default=False)
     total_questions = len(st.session_state.quiz_pool)
-    st.sidebar.write(f"Total: {total_questions}")
+    if st.session_state.adaptive_mode:
+        # Adaptive quizzes are answered in order, so show progress instead of navigation buttons
+        theta, se = st.session_state.adaptive_estimate
+        st.sidebar.write(f"Question {total_questions} of at most {st.session_state.adaptive_max_items}")
+        st.sidebar.metric("Ability Estimate", f"{theta:+.2f}", help=f"Standard error: {se:.2f} (target {st.session_state.adaptive_target_se:.2f})")
+        total_questions = 0
+    elif st.session_state.drill_mode:
+        # Drill questions are navigated inside the block component
+        block_count = -(-total_questions // DRILL_BLOCK_SIZE)
+        st.sidebar.write(f"Block {st.session_state.drill_block_index + 1} of {block_count} ({total_questions} questions)")
+        if st.session_state.drill_last_score is not None:
+            correct, graded = st.session_state.drill_last_score
+            st.sidebar.metric("Last Block", f"{correct}/{graded}")
+        total_questions = 0
+    else:
+        st.sidebar.write(f"Total: {total_questions}")
     for i in range(total_questions):
         q_data = st.session_state.quiz_pool[i]
         q_type = q_data.get('Type','?')
@@ -440,7 +939,7 @@ def display_sidebar_quiz():
             navigate_question(i)
 
     st.sidebar.divider()
-    if st.sidebar.button("Submit Quiz", type="primary", use_container_width=True):
+    if st.sidebar.button("Submit Quiz", type="primary", width="stretch"):
         submit_quiz()
         st.rerun()
 
@@ -486,6 +985,64 @@ def init_session_state():
         st.session_state.learning_mode = False  # Flag for learning mode
     if 'verified_matching_questions' not in st.session_state:
         st.session_state.verified_matching_questions = {}  # {q_idx_pool: bool} to track verified matching questions
+
+    # Attempt History State
+    if 'user_name' not in st.session_state:
+        st.session_state.user_name = ""  # Trainee name recorded with each attempt
+    if 'quiz_id' not in st.session_state:
+        st.session_state.quiz_id = ""  # Identifies the current quiz in the attempt history
+    if 'bank_version' not in st.session_state:
+        st.session_state.bank_version = None  # Version of the bank loaded into this session
+    if 'quiz_bank_version' not in st.session_state:
+        st.session_state.quiz_bank_version = None  # Version the current quiz pool was drawn from (render cache key)
+
+    # Source Coverage State
+    if 'coverage_gap_mode' not in st.session_state:
+        st.session_state.coverage_gap_mode = False  # Flag for drawing questions from the weakest pages
+    if 'page_coverage' not in st.session_state:
+        st.session_state.page_coverage = {}  # {page: [answered, correct]} for page_coverage_user
+    if 'page_coverage_user' not in st.session_state:
+        st.session_state.page_coverage_user = None  # Trainee name page_coverage was loaded for
+    if 'show_dashboard' not in st.session_state:
+        st.session_state.show_dashboard = False  # Flag for the instructor cohort dashboard
+    if 'instructor_unlocked' not in st.session_state:
+        st.session_state.instructor_unlocked = False  # Set by the instructor password; never persisted or shared
+
+    # Adaptive Mode State
+    if 'adaptive_mode' not in st.session_state:
+        st.session_state.adaptive_mode = False  # Flag for adaptive mode
+    if 'adaptive_max_items' not in st.session_state:
+        st.session_state.adaptive_max_items = 30  # Hard cap on adaptive quiz length
+    if 'adaptive_target_se' not in st.session_state:
+        st.session_state.adaptive_target_se = 0.35  # Stop once the ability standard error falls below this
+    if 'adaptive_item_ids' not in st.session_state:
+        st.session_state.adaptive_item_ids = []  # Stable ids of administered items, in quiz_pool order
+    if 'adaptive_log_posterior' not in st.session_state:
+        st.session_state.adaptive_log_posterior = []  # Log posterior over quiz_adaptive.THETA_GRID
+    if 'adaptive_estimate' not in st.session_state:
+        st.session_state.adaptive_estimate = (0.0, 1.0)  # (ability, standard error)
+
+    # Timed Exam State
+    if 'timed_mode' not in st.session_state:
+        st.session_state.timed_mode = False  # Flag for timed exam mode
+    if 'exam_minutes' not in st.session_state:
+        st.session_state.exam_minutes = 30  # Exam length chosen on the setup screen
+    if 'exam_deadline' not in st.session_state:
+        st.session_state.exam_deadline = None  # time.time() value after which answers are rejected
+    if 'exam_auto_submitted' not in st.session_state:
+        st.session_state.exam_auto_submitted = False  # True when the deadline submitted the quiz
+
+    # Drill Mode State
+    if 'drill_mode' not in st.session_state:
+        st.session_state.drill_mode = False  # Flag for rapid-fire drill mode
+    if 'drill_block_index' not in st.session_state:
+        st.session_state.drill_block_index = 0  # Block of DRILL_BLOCK_SIZE questions currently in the browser
+    if 'drill_last_score' not in st.session_state:
+        st.session_state.drill_last_score = None  # (correct, total) for the most recently graded block
+
+    # Results Review State
+    if 'review_index' not in st.session_state:
+        st.session_state.review_index = {}  # {'quiz_id': ..., 'items': [per-question status]} built once per quiz
         
     # Load questions immediately
     if not st.session_state.questions_by_type:
@@ -496,6 +1053,7 @@ def init_session_state():
             if questions_by_type and isinstance(questions_by_type, dict):
                 st.session_state.questions_by_type = questions_by_type
                 st.session_state.matching_groups_data = matching_groups_data
+                st.session_state.bank_version = get_bank_version(CSV_FILENAME)
                 
                 # Calculate available counts (excluding matching initially)
                 st.session_state.available_counts = {
@@ -516,6 +1074,7 @@ def init_session_state():
 def verify_matching_question(q_idx_pool):
     """Marks a matching question as verified for Learning Mode."""
     st.session_state.verified_matching_questions[q_idx_pool] = True
+    log_event('verify', q_idx_pool)
 
 def display_question_quiz(q_idx_pool):
     if not st.session_state.quiz_pool or q_idx_pool >= len(st.session_state.quiz_pool):
@@ -524,11 +1083,12 @@ def display_question_quiz(q_idx_pool):
 
     question_data = st.session_state.quiz_pool[q_idx_pool]
     q_type = question_data.get('Type', 'N/A')
-    question_text = question_data.get('Question', 'N/A')
-    explanation = question_data.get('Explanation', 'No explanation provided.')
+    static_parts = rendered_question(question_data)  # Shared across users; only answer-dependent parts are built here
+    explanation = static_parts['explanation']
 
-    st.subheader(f"Question {q_idx_pool + 1} of {len(st.session_state.quiz_pool)} ({q_type})")
-    st.markdown(f"**{question_text}**")
+    question_total = st.session_state.adaptive_max_items if st.session_state.adaptive_mode else len(st.session_state.quiz_pool)
+    st.subheader(f"Question {q_idx_pool + 1} of {question_total} ({q_type})")
+    st.markdown(static_parts['question_md'])
 
     # --- Flag with Button Instead of Checkbox ---
     is_flagged = st.session_state.flagged_questions.get(q_idx_pool, False)
@@ -540,8 +1100,7 @@ def display_question_quiz(q_idx_pool):
         flag_button_key = f"flag_btn_{q_idx_pool}"
         
         if st.button(flag_icon, key=flag_button_key):
-            # Toggle flag state
-            st.session_state.flagged_questions[q_idx_pool] = not is_flagged
+            toggle_flag(q_idx_pool)
             st.rerun()  # Rerun to update UI immediately
     
     with flag_col2:
@@ -555,9 +1114,7 @@ def display_question_quiz(q_idx_pool):
     is_verified = False  # For matching questions
 
     if q_type == 'MCQ':
-        correct_answer = question_data.get('CorrectAnswer', 'N/A')
-        distractors = question_data.get('Distractors', [])
-        options = distractors + [correct_answer]
+        options = list(static_parts['options'])  # Copy: the cached tuple is shared
 
         # Shuffle options only once per question
         if q_idx_pool not in st.session_state.shuffled_mcq_options:
@@ -579,7 +1136,7 @@ def display_question_quiz(q_idx_pool):
         
         # Save answer directly without on_change to avoid duplication
         if not has_answer:
-            st.session_state.user_answers[q_idx_pool] = answer
+            set_answer(q_idx_pool, answer, 'render')
 
     elif q_type == 'TF':
         options = ["True", "False"]
@@ -592,11 +1149,8 @@ def display_question_quiz(q_idx_pool):
         )
         
         # Convert string to boolean and save for initial answer
-        if not has_answer:
-            if answer == "True":
-                st.session_state.user_answers[q_idx_pool] = True
-            elif answer == "False":
-                st.session_state.user_answers[q_idx_pool] = False
+        if not has_answer and answer in ("True", "False"):
+            set_answer(q_idx_pool, answer == "True", 'render')
 
     elif q_type == 'FillBlank':
         answer = st.text_input(
@@ -606,25 +1160,19 @@ def display_question_quiz(q_idx_pool):
         
         # Save answer directly for initial value
         if not has_answer and answer:
-            st.session_state.user_answers[q_idx_pool] = answer
+            set_answer(q_idx_pool, answer, 'render')
 
     elif q_type == 'MatchingGroup':
-        group_name = question_data.get('Group', 'Unknown Group')
-        matching_terms = question_data.get('MatchingTerms', [])
-        
-        st.write(f"**Matching Group: {group_name}**")
+        st.write(static_parts['group_md'])
         st.write("Match each term on the left with its definition on the right.")
         
         # Initialize matching answers for this question if needed
         if q_idx_pool not in st.session_state.matching_answers:
             st.session_state.matching_answers[q_idx_pool] = {}
         
-        # Get all definitions and shuffle them (only once per quiz session)
-        all_definitions = [term.get('Definition', 'No definition') for term in matching_terms]
-        
-        # Shuffle definitions the first time we see this question
+        # Shuffle definitions the first time we see this question (only once per quiz session)
         if q_idx_pool not in st.session_state.shuffled_matching_definitions:
-            shuffled_definitions = all_definitions.copy()
+            shuffled_definitions = list(static_parts['definitions'])
             random.shuffle(shuffled_definitions)
             st.session_state.shuffled_matching_definitions[q_idx_pool] = shuffled_definitions
         else:
@@ -634,13 +1182,12 @@ def display_question_quiz(q_idx_pool):
         # Create a table-like display with terms on left, dropdown selection on right
         all_terms_matched = True  # Track if all terms have selections
         
-        for i, term_data in enumerate(matching_terms):
-            term = term_data.get('Term', 'Unknown Term')
-            correct_definition = term_data.get('Definition', 'No definition')
+        for i, term_parts in enumerate(static_parts['terms']):
+            term = term_parts['term']
             
             cols = st.columns([3, 1, 4])
             with cols[0]:
-                st.write(f"**{i+1}. {term}**")
+                st.write(term_parts['label_md'])
             
             with cols[2]:
                 current_selection = st.session_state.matching_answers.get(q_idx_pool, {}).get(i)
@@ -674,26 +1221,19 @@ def display_question_quiz(q_idx_pool):
                     all_terms_matched = False
 
         # Store the matching answers in the user_answers dictionary
-        st.session_state.user_answers[q_idx_pool] = st.session_state.matching_answers.get(q_idx_pool, {})
+        set_answer(q_idx_pool, dict(st.session_state.matching_answers.get(q_idx_pool, {})), 'render')
         
         # Add a verify button for learning mode
         if st.session_state.learning_mode:
             is_verified = st.session_state.verified_matching_questions.get(q_idx_pool, False)
             
             if not is_verified:
-                if st.button("Verify Answers", key=f"verify_btn_{q_idx_pool}", use_container_width=True):
+                if st.button("Verify Answers", key=f"verify_btn_{q_idx_pool}", width="stretch"):
                     verify_matching_question(q_idx_pool)
                     st.rerun()
         
     elif q_type == 'Matching':  # Handle individual matching items (should not occur with our fix)
-        st.info(f"""
-        **Matching Term:**
-        Term: **{question_data.get('Term', 'N/A')}**
-        Group: **{question_data.get('Group', 'N/A')}**
-        Definition: **{question_data.get('Definition', 'N/A')}**
-
-        *(Note: This is part of a matching group. Please see the group question.)*
-        """, icon='📝')
+        st.info(static_parts['info_md'], icon='📝')
 
     else:
         st.warning(f"Unsupported question type: {q_type}")
@@ -723,7 +1263,7 @@ def display_question_quiz(q_idx_pool):
                     st.markdown("✅ **Correct!**")
                 else:
                     st.markdown("❌ **Incorrect.**")
-                    st.markdown(f"Correct answer: **{correct_answer}**")
+                    st.markdown(static_parts['correct_md'])
                 
                 # Show explanation
                 if explanation:
@@ -740,6 +1280,7 @@ def display_question_quiz(q_idx_pool):
                 for i, term_data in enumerate(matching_terms):
                     term = term_data.get('Term', 'Unknown Term')
                     correct_definition = term_data.get('Definition', 'No definition')
+                    term_parts = static_parts['terms'][i]
                     user_definition = user_matching_answers.get(i)
                     
                     if user_definition:
@@ -747,11 +1288,11 @@ def display_question_quiz(q_idx_pool):
                         result_icon = "✅" if is_term_correct else "❌"
                         
                         # Display term result
-                        st.markdown(f"{result_icon} **{term}**")
+                        st.markdown(f"{result_icon} {term_parts['result_md']}")
                         
                         if not is_term_correct:
                             st.markdown(f"Your match: {user_definition}")
-                            st.markdown(f"Correct match: **{correct_definition}**")
+                            st.markdown(term_parts['correct_md'])
                         
                         # Show explanation if available for the term
                         term_explanation = term_data.get('Explanation', '')
@@ -764,26 +1305,86 @@ def display_question_quiz(q_idx_pool):
     # --- Navigation Buttons ---
     col1, col2, col3 = st.columns([1, 8, 1])
     with col1:
-        if q_idx_pool > 0:
+        if q_idx_pool > 0 and not st.session_state.adaptive_mode:
             prev_button_key = f"prev_btn_{q_idx_pool}"
-            if st.button("⬅️ Previous", key=prev_button_key, use_container_width=True):
-                st.session_state.current_question_index = q_idx_pool - 1
+            if st.button("⬅️ Previous", key=prev_button_key, width="stretch"):
+                navigate_question(q_idx_pool - 1)
                 st.rerun()
     
     with col3:
-        if q_idx_pool < len(st.session_state.quiz_pool) - 1:
+        if st.session_state.adaptive_mode:
             next_button_key = f"next_btn_{q_idx_pool}"
-            if st.button("Next ➡️", key=next_button_key, use_container_width=True):
-                st.session_state.current_question_index = q_idx_pool + 1
+            is_answered = st.session_state.user_answers.get(q_idx_pool) is not None
+            if st.button("Next ➡️", key=next_button_key, disabled=not is_answered, width="stretch"):
+                advance_adaptive_quiz(q_idx_pool)
+                st.rerun()
+        elif q_idx_pool < len(st.session_state.quiz_pool) - 1:
+            next_button_key = f"next_btn_{q_idx_pool}"
+            if st.button("Next ➡️", key=next_button_key, width="stretch"):
+                navigate_question(q_idx_pool + 1)
                 st.rerun()
         else:
             review_button_key = f"review_btn_{q_idx_pool}"
-            if st.button("Review/Submit", key=review_button_key, type="primary", use_container_width=True):
+            if st.button("Review/Submit", key=review_button_key, type="primary", width="stretch"):
                 submit_quiz()
                 st.rerun()
 
+def drill_block_payload(block_start):
+    """Builds the compact question list for one drill block (answers stay on the server)."""
+    payload = []
+    for q_idx_pool in range(block_start, min(block_start + DRILL_BLOCK_SIZE, len(st.session_state.quiz_pool))):
+        q_data = st.session_state.quiz_pool[q_idx_pool]
+        item = {'type': q_data.get('Type'), 'question': q_data.get('Question', '')}
+        if item['type'] == 'MCQ':
+            if q_idx_pool not in st.session_state.shuffled_mcq_options:
+                # Same cached options and shuffle as the standard view (prepare_quiz normally did this already)
+                options = rendered_question(q_data)['options']
+                st.session_state.shuffled_mcq_options[q_idx_pool] = random.sample(options, len(options))
+            item['options'] = st.session_state.shuffled_mcq_options[q_idx_pool]
+        payload.append(item)
+    return payload
+
+def grade_drill_block(block_start, answers):
+    """Stores a block's answers in one batch, then moves to the next block or submits."""
+    if exam_time_expired(EXAM_GRACE_SECONDS):
+        submit_quiz()  # Late answers are discarded and the exam is closed
+        return
+
+    correct = 0
+    for offset, answer in enumerate(answers):
+        q_idx_pool = block_start + offset
+        if q_idx_pool >= len(st.session_state.quiz_pool) or answer in (None, ""):
+            continue
+        q_data = st.session_state.quiz_pool[q_idx_pool]
+        user_answer = (answer == "True") if q_data.get('Type') == "TF" else answer
+        set_answer(q_idx_pool, user_answer, 'drill')
+        correct += quiz_bank.is_answer_correct(q_data, user_answer)
+    st.session_state.drill_last_score = (correct, len(answers))
+
+    if block_start + DRILL_BLOCK_SIZE >= len(st.session_state.quiz_pool):
+        submit_quiz()
+    else:
+        st.session_state.drill_block_index += 1
+
+def display_drill_block():
+    block_index = st.session_state.drill_block_index
+    block_start = block_index * DRILL_BLOCK_SIZE
+    block_id = f"{st.session_state.quiz_id}_{block_index}"
+
+    st.title("Drill")
+    if st.session_state.drill_last_score is not None:
+        correct, graded = st.session_state.drill_last_score
+        st.success(f"Previous block: {correct} of {graded} correct.")
+
+    result = drill_block(questions=drill_block_payload(block_start), block_id=block_id,
+                         key=f"drill_{block_id}", default=None)
+    if result and result.get('block_id') == block_id:
+        grade_drill_block(block_start, result.get('answers', []))
+        st.rerun()
+
 def reset_quiz():
     """Resets the quiz state to allow starting a new quiz while keeping the user logged in."""
+    log_event('reset')
     # Keep login state but reset quiz and setup
     st.session_state.setup_complete = False
     st.session_state.quiz_pool = []
@@ -795,62 +1396,178 @@ def reset_quiz():
     st.session_state.matching_answers = {}
     st.session_state.shuffled_matching_definitions = {}  # Reset the shuffled definitions
     st.session_state.verified_matching_questions = {}  # Reset verified matching questions
+    st.session_state.adaptive_item_ids = []
+    st.session_state.adaptive_log_posterior = []
+    st.session_state.adaptive_estimate = (0.0, 1.0)
+    st.session_state.exam_deadline = None
+    st.session_state.exam_auto_submitted = False
+    st.session_state.drill_block_index = 0
+    st.session_state.drill_last_score = None
+    st.session_state.review_index = {}
+    # Clear review filters, paging and opened details so they don't carry over to the next quiz
+    for key in [key for key in st.session_state if str(key).startswith('review_')]:
+        if key != 'review_index':
+            del st.session_state[key]
     # Reset selected counts too
     st.session_state.selected_counts = {
         q_type: 0 for q_type in st.session_state.available_counts
     }
     st.session_state.selected_matching_groups = []
     # Keep learning mode setting for next quiz
+    # The setup screen prefetches again once new counts are chosen
+    get_quiz_prefetcher().cancel(st.session_state.session_id)
 
-def display_results_quiz():
-    st.title("Quiz Results")
-
-    score = 0
-    total_questions_in_pool = len(st.session_state.quiz_pool)
-    interactive_question_count = 0  # Count only questions that were interactively answerable
-    answered_count = 0
-    matching_term_count = 0  # Count of individual matching terms
-    matching_correct_count = 0  # Count of correctly matched terms
+def build_review_index():
+    """Grades every pool item once after submit so filtering and paging don't regrade on each rerun."""
+    if st.session_state.review_index.get('quiz_id') == st.session_state.quiz_id:
+        return st.session_state.review_index['items']
 
-    # Calculate score
+    items = []
     for i, q_data in enumerate(st.session_state.quiz_pool):
+        q_type = q_data.get('Type', 'N/A')
         user_answer = st.session_state.user_answers.get(i)
-        q_type = q_data.get('Type')
-
-        # Handle different question types for scoring
-        if q_type in ["MCQ", "TF", "FillBlank"]:
-            correct_answer = q_data.get('CorrectAnswer')
-            interactive_question_count += 1
-            if user_answer is not None:
-                answered_count += 1
-                is_correct = False
-                if q_type == "TF": 
-                    is_correct = (user_answer == correct_answer)
-                elif q_type in ["MCQ", "FillBlank"]: 
-                    is_correct = (str(user_answer).strip().lower() == str(correct_answer).strip().lower())
-
-                if is_correct: 
-                    score += 1
-        
+        status = 'info'
+        if q_type in STANDARD_TYPES:
+            if user_answer is None:
+                status = 'unanswered'
+            else:
+                status = 'correct' if quiz_bank.is_answer_correct(q_data, user_answer) else 'incorrect'
         elif q_type == "MatchingGroup":
-            # For matching groups, each term is counted separately
             matching_terms = q_data.get('MatchingTerms', [])
-            group_term_count = len(matching_terms)
-            matching_term_count += group_term_count
+            correct_terms = sum(
+                1 for term_idx, term_data in enumerate(matching_terms)
+                if user_answer and term_idx in user_answer
+                and quiz_bank.is_match_correct(user_answer[term_idx], term_data.get('Definition', ''))
+            )
+            if not user_answer:
+                status = 'unanswered'
+            elif correct_terms == len(matching_terms):
+                status = 'correct'
+            else:
+                status = 'partial' if correct_terms else 'incorrect'
+        items.append({
+            'index': i, 'type': q_type, 'status': status,
+            'flagged': st.session_state.flagged_questions.get(i, False),
+        })
+
+    st.session_state.review_index = {'quiz_id': st.session_state.quiz_id, 'items': items}
+    return items
+
+def display_review_detail(i, q_data):
+    """Renders the answer breakdown for one reviewed question."""
+    q_type = q_data.get('Type', 'N/A')
+    user_answer = st.session_state.user_answers.get(i)
+    explanation = q_data.get('Explanation', 'No explanation provided.')
+
+    if q_type in ["MCQ", "TF", "FillBlank"]:
+        correct_answer = q_data.get('CorrectAnswer', 'N/A')
+        
+        # Determine correctness for display
+        is_correct = None
+        if user_answer is not None:
+            if q_type == "TF": 
+                is_correct = (user_answer == correct_answer)
+            else: 
+                is_correct = (str(user_answer).strip().lower() == str(correct_answer).strip().lower())
+
+        # Setup display elements
+        result_color = "gray"
+        result_icon = ""
+
+        if is_correct is True: 
+            result_color, result_icon = "green", "✅ Correct"
+        elif is_correct is False: 
+            result_color, result_icon = "red", "❌ Incorrect"
+        else: 
+            result_color, result_icon = "orange", "❓ Not Answered"
+
+        # Display user's answer vs correct answer
+        if user_answer is not None:
+            st.markdown(f"Your Answer: <span style='color:{result_color};'>{str(user_answer)}</span>", unsafe_allow_html=True)
+            if not is_correct:
+                correct_display = str(correct_answer)
+                st.markdown(f"Correct Answer: <span style='color:green;'>{correct_display}</span>", unsafe_allow_html=True)
+        else:
+            st.markdown("Your Answer: <span style='color:orange;'>Not Answered</span>", unsafe_allow_html=True)
+            correct_display = str(correct_answer)
+            st.markdown(f"Correct Answer: <span style='color:green;'>{correct_display}</span>", unsafe_allow_html=True)
+        
+        # Show explanation in an expander
+        if explanation:
+            with st.expander("Show Explanation"):
+                st.write(explanation)
+        
+        # Show result icon at the end
+        st.markdown(f"*{result_icon}*")
+        
+    elif q_type == "MatchingGroup":
+        # Display matching group results
+        matching_terms = q_data.get('MatchingTerms', [])
+        group_name = q_data.get('Group', 'Unknown Group')
+        
+        st.write(f"**Matching Group: {group_name}**")
+        
+        # Create a table to display results
+        if matching_terms:
+            # Add a header for the results table
+            col_headers = st.columns([3, 4, 3])
+            with col_headers[0]:
+                st.write("**Term**")
+            with col_headers[1]:
+                st.write("**Your Match**")
+            with col_headers[2]:
+                st.write("**Correct Match**")
             
-            # Count answered terms
-            if user_answer:  # Dictionary of {term_idx: selected_definition}
-                answered_count += len(user_answer)
+            # Display each term and result
+            for term_idx, term_data in enumerate(matching_terms):
+                term = term_data.get('Term', 'Unknown')
+                correct_definition = term_data.get('Definition', 'No definition')
                 
-                # Check correct matches
-                for term_idx, term_data in enumerate(matching_terms):
-                    if term_idx in user_answer:
-                        selected_definition = user_answer[term_idx]
-                        correct_definition = term_data.get('Definition', '')
-                        
-                        if selected_definition.strip().lower() == correct_definition.strip().lower():
-                            matching_correct_count += 1
-                            score += 1
+                # Get user's selection for this term
+                user_selection = user_answer.get(term_idx, "Not answered") if user_answer else "Not answered"
+                
+                # Determine if the match was correct
+                is_match_correct = user_selection.strip().lower() == correct_definition.strip().lower() if user_selection != "Not answered" else False
+                
+                # Display the term and matches
+                cols = st.columns([3, 4, 3])
+                with cols[0]:
+                    st.write(f"{term_idx+1}. {term}")
+                
+                with cols[1]:
+                    if user_selection == "Not answered":
+                        st.markdown("<span style='color:orange;'>Not answered</span>", unsafe_allow_html=True)
+                    elif is_match_correct:
+                        st.markdown(f"<span style='color:green;'>{user_selection} ✅</span>", unsafe_allow_html=True)
+                    else:
+                        st.markdown(f"<span style='color:red;'>{user_selection} ❌</span>", unsafe_allow_html=True)
+                
+                with cols[2]:
+                    st.write(correct_definition)
+        
+        else:
+            st.write("No terms available for this matching group.")
+    
+    elif q_type == "Matching":  # Individual matching item (shouldn't appear)
+        st.info(f"""
+        Term: **{q_data.get('Term', 'N/A')}**
+        Group: **{q_data.get('Group', 'N/A')}**
+        Correct Definition: **{q_data.get('Definition', 'N/A')}**
+        """)
+
+def display_results_quiz():
+    st.title("Quiz Results")
+    if st.session_state.exam_auto_submitted:
+        st.warning("Time expired. Your exam was submitted automatically with the answers saved before the deadline.")
+
+    total_questions_in_pool = len(st.session_state.quiz_pool)
+
+    # Calculate score
+    results = quiz_bank.score_quiz(st.session_state.quiz_pool, st.session_state.user_answers)
+    score = results['score']
+    interactive_question_count = results['interactive_question_count']
+    answered_count = results['answered_count']
+    matching_term_count = results['matching_term_count']
 
     # Total interactive question count includes individual terms in matching groups
     total_interactive = interactive_question_count + matching_term_count
@@ -863,127 +1580,100 @@ def display_results_quiz():
         st.subheader("No scorable questions were included in the quiz.")
 
     st.write(f"Answered: {answered_count} out of {total_interactive} interactive questions/terms.")
+    if st.session_state.adaptive_mode and st.session_state.adaptive_item_ids:
+        theta, se = st.session_state.adaptive_estimate
+        st.write(f"Adaptive ability estimate: **{theta:+.2f}** (standard error {se:.2f}) after {len(st.session_state.adaptive_item_ids)} questions.")
     st.write(f"Total items in quiz: {total_questions_in_pool} (containing {total_interactive} scorable items)")
     st.divider()
 
     st.header("Review Answers")
 
-    for i, q_data in enumerate(st.session_state.quiz_pool):
-        q_type = q_data.get('Type', 'N/A')
-        question_text = q_data.get('Question', 'N/A')
-        user_answer = st.session_state.user_answers.get(i)
-        explanation = q_data.get('Explanation', 'No explanation provided.')
-
-        st.markdown(f"**Question {i+1} ({q_type}): {question_text}**")
-        
-        if q_type in ["MCQ", "TF", "FillBlank"]:
-            correct_answer = q_data.get('CorrectAnswer', 'N/A')
-            
-            # Determine correctness for display
-            is_correct = None
-            if user_answer is not None:
-                if q_type == "TF": 
-                    is_correct = (user_answer == correct_answer)
-                else: 
-                    is_correct = (str(user_answer).strip().lower() == str(correct_answer).strip().lower())
-
-            # Setup display elements
-            result_color = "gray"
-            result_icon = ""
-
-            if is_correct is True: 
-                result_color, result_icon = "green", "✅ Correct"
-            elif is_correct is False: 
-                result_color, result_icon = "red", "❌ Incorrect"
-            else: 
-                result_color, result_icon = "orange", "❓ Not Answered"
-
-            # Display user's answer vs correct answer
-            if user_answer is not None:
-                st.markdown(f"Your Answer: <span style='color:{result_color};'>{str(user_answer)}</span>", unsafe_allow_html=True)
-                if not is_correct:
-                    correct_display = str(correct_answer)
-                    st.markdown(f"Correct Answer: <span style='color:green;'>{correct_display}</span>", unsafe_allow_html=True)
-            else:
-                st.markdown("Your Answer: <span style='color:orange;'>Not Answered</span>", unsafe_allow_html=True)
-                correct_display = str(correct_answer)
-                st.markdown(f"Correct Answer: <span style='color:green;'>{correct_display}</span>", unsafe_allow_html=True)
-            
-            # Show explanation in an expander
-            if explanation:
-                with st.expander("Show Explanation"):
-                    st.write(explanation)
-            
-            # Show result icon at the end
-            st.markdown(f"*{result_icon}*")
-            
-        elif q_type == "MatchingGroup":
-            # Display matching group results
-            matching_terms = q_data.get('MatchingTerms', [])
-            group_name = q_data.get('Group', 'Unknown Group')
-            
-            st.write(f"**Matching Group: {group_name}**")
-            
-            # Create a table to display results
-            if matching_terms:
-                # Add a header for the results table
-                col_headers = st.columns([3, 4, 3])
-                with col_headers[0]:
-                    st.write("**Term**")
-                with col_headers[1]:
-                    st.write("**Your Match**")
-                with col_headers[2]:
-                    st.write("**Correct Match**")
-                
-                # Display each term and result
-                for term_idx, term_data in enumerate(matching_terms):
-                    term = term_data.get('Term', 'Unknown')
-                    correct_definition = term_data.get('Definition', 'No definition')
-                    
-                    # Get user's selection for this term
-                    user_selection = user_answer.get(term_idx, "Not answered") if user_answer else "Not answered"
-                    
-                    # Determine if the match was correct
-                    is_match_correct = user_selection.strip().lower() == correct_definition.strip().lower() if user_selection != "Not answered" else False
-                    
-                    # Display the term and matches
-                    cols = st.columns([3, 4, 3])
-                    with cols[0]:
-                        st.write(f"{term_idx+1}. {term}")
-                    
-                    with cols[1]:
-                        if user_selection == "Not answered":
-                            st.markdown("<span style='color:orange;'>Not answered</span>", unsafe_allow_html=True)
-                        elif is_match_correct:
-                            st.markdown(f"<span style='color:green;'>{user_selection} ✅</span>", unsafe_allow_html=True)
-                        else:
-                            st.markdown(f"<span style='color:red;'>{user_selection} ❌</span>", unsafe_allow_html=True)
-                    
-                    with cols[2]:
-                        st.write(correct_definition)
-            
-            else:
-                st.write("No terms available for this matching group.")
-        
-        elif q_type == "Matching":  # Individual matching item (shouldn't appear)
-            st.info(f"""
-            Term: **{q_data.get('Term', 'N/A')}**
-            Group: **{q_data.get('Group', 'N/A')}**
-            Correct Definition: **{q_data.get('Definition', 'N/A')}**
-            """)
-        
+    review_items = build_review_index()
+    filter_cols = st.columns([2, 3, 1])
+    with filter_cols[0]:
+        show = st.radio("Show", ["All", "Wrong only", "Flagged only"], horizontal=True, key="review_filter")
+    with filter_cols[1]:
+        pool_types = sorted({item['type'] for item in review_items})
+        types = st.multiselect("Question types", pool_types, default=pool_types, key="review_types")
+
+    visible = [
+        item for item in review_items
+        if item['type'] in types
+        and (show != "Wrong only" or item['status'] in ('incorrect', 'unanswered', 'partial'))
+        and (show != "Flagged only" or item['flagged'])
+    ]
+    page_count = max(1, -(-len(visible) // REVIEW_PAGE_SIZE))
+    with filter_cols[2]:
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, key="review_page")
+    st.caption(f"{len(visible)} of {len(review_items)} questions match · page {page} of {page_count}")
+
+    # Only the current page is rendered, and each item's breakdown only once it is opened
+    for item in visible[(page - 1) * REVIEW_PAGE_SIZE:page * REVIEW_PAGE_SIZE]:
+        i = item['index']
+        q_data = st.session_state.quiz_pool[i]
+        flag_icon = " 🚩" if item['flagged'] else ""
+        st.markdown(f"{REVIEW_STATUS_ICONS[item['status']]} **Question {i+1} ({item['type']}): {q_data.get('Question', 'N/A')}**{flag_icon}")
+        if st.toggle("Show details", key=f"review_detail_{i}"):
+            display_review_detail(i, q_data)
         st.divider()
-        
+
     # Add a button to take another quiz
-    if st.button("Take Another Quiz", type="primary", use_container_width=True):
+    if st.button("Take Another Quiz", type="primary", width="stretch"):
         reset_quiz()
         st.rerun()
 
+def display_cohort_dashboard():
+    st.title("Cohort Dashboard")
+    if st.button("⬅️ Back to Setup"):
+        st.session_state.show_dashboard = False
+        st.rerun()
+
+    with st.expander("Worker Caches (this worker)"):
+        render_stats = get_render_cache().stats()
+        cache_cols = st.columns(4)
+        cache_cols[0].metric("Hits", render_stats['hits'])
+        cache_cols[1].metric("Misses", render_stats['misses'])
+        cache_cols[2].metric("Hit Rate", f"{render_stats['hit_rate']:.1%}")
+        cache_cols[3].metric("Questions Cached", render_stats['entries'])
+        st.caption(f"{render_stats['bytes'] / 1024:.0f} KiB of {RENDER_CACHE_MAX_BYTES / 1024:.0f} KiB used; "
+                   f"{render_stats['evictions']} evicted.")
+        prefetch_stats = get_quiz_prefetcher().stats()
+        st.caption(f"Next-quiz precomputation: {prefetch_stats['hits']} used, {prefetch_stats['misses']} built on click, "
+                   f"{prefetch_stats['cancelled']} cancelled, {prefetch_stats['pending']} pending.")
+        event_stats = get_event_log().stats()
+        st.caption(f"Event log: {event_stats['written']} written, {event_stats['queued']} queued, "
+                   f"{event_stats['dropped']} dropped, {event_stats['write_errors']} failed writes.")
+
+    summary = load_cohort_summary(HISTORY_FILENAME, CSV_FILENAME)
+    if summary is None:
+        st.info("No quiz attempts have been recorded yet.")
+        return
+
+    st.caption(f"Aggregates refresh every {DASHBOARD_TTL_SECONDS} seconds.")
+    metric_cols = st.columns(4)
+    metric_cols[0].metric("Trainees", summary['trainees'])
+    metric_cols[1].metric("Quizzes Submitted", summary['quizzes'])
+    metric_cols[2].metric("Answers Graded", summary['answers'])
+    metric_cols[3].metric("Overall Accuracy", f"{summary['accuracy']:.1%}")
+
+    accuracy_column = st.column_config.ProgressColumn("Accuracy", format="percent", min_value=0, max_value=1)
+    tabs = st.tabs(["By Trainee", "By Question Type", "By Matching Group", "By Cited Page"])
+    for tab, key in zip(tabs, ['by_user', 'by_type', 'by_group', 'by_page']):
+        with tab:
+            if summary[key].empty:
+                st.write("No attempts recorded for this view.")
+            else:
+                st.dataframe(summary[key], hide_index=True, width="stretch",
+                             column_config={'accuracy': accuracy_column})
+
 # --- Main App Logic ---
 init_session_state()
+restore_session_state()
 
 if not st.session_state.questions_by_type:
     st.error("Question data could not be loaded. Please check the CSV file format.")
+elif st.session_state.show_dashboard and st.session_state.instructor_unlocked:
+    display_cohort_dashboard()
 elif not st.session_state.setup_complete:
     display_setup_screen()
 elif st.session_state.submitted:
@@ -995,6 +1685,16 @@ else:
         if st.button("Return to Setup"):
             st.session_state.setup_complete = False
             st.rerun()
+    elif exam_time_expired():
+        # Any rerun after the deadline (normally the timer component's expiry message) closes the exam
+        submit_quiz()
+        st.rerun()
+    elif st.session_state.drill_mode and not st.session_state.adaptive_mode:
+        display_sidebar_quiz()
+        display_drill_block()
     else:
         display_sidebar_quiz()
-        display_question_quiz(st.session_state.current_question_index)
\ No newline at end of file
+        display_question_quiz(st.session_state.current_question_index)
+
+# Save after every run so another worker can pick the session up from here
+persist_session_state()
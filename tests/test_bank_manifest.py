@@ -0,0 +1,34 @@
+import json
+import os
+
+import quiz_bank
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_committed_manifest_matches_bank():
+    """bank_manifest.json must be regenerated whenever test_bank.csv changes."""
+    _, _, all_questions = quiz_bank.parse_question_bank(os.path.join(ROOT, 'test_bank.csv'))
+    with open(os.path.join(ROOT, 'bank_manifest.json'), encoding='utf-8') as manifest_file:
+        committed = json.load(manifest_file)
+    assert committed == quiz_bank.build_manifest(all_questions), (
+        "bank_manifest.json is stale; run: python quiz_bank.py manifest test_bank.csv --output bank_manifest.json"
+    )
+
+
+def test_manifest_check_fails_when_stale(tmp_path):
+    stale = tmp_path / 'stale.json'
+    stale.write_text(json.dumps({'version': 'old', 'items': {}}), encoding='utf-8')
+    bank = os.path.join(ROOT, 'test_bank.csv')
+    assert quiz_bank.main(['manifest', bank, '--check', str(stale)]) == 1
+    assert quiz_bank.main(['manifest', bank, '--check', os.path.join(ROOT, 'bank_manifest.json')]) == 0
+
+
+def test_file_version_follows_content_not_mtime(tmp_path):
+    bank = tmp_path / 'bank.csv'
+    bank.write_text("Type,Question\nTF,Sky is blue\n", encoding='utf-8')
+    version = quiz_bank.file_version(str(bank))
+    os.utime(bank, (0, 0))
+    assert quiz_bank.file_version(str(bank)) == version
+    bank.write_text("Type,Question\nTF,Sky is green\n", encoding='utf-8')
+    assert quiz_bank.file_version(str(bank)) != version
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import quiz_adaptive
+
+
+def items(count, q_type='MCQ'):
+    return [{'id': f'item-{i}', 'Type': q_type} for i in range(count)]
+
+
+def attempts(rows, mode='standard'):
+    """rows: [(quiz_id, item_id, correct), ...]"""
+    frame = pd.DataFrame(rows, columns=['quiz_id', 'item_id', 'correct'])
+    return frame.assign(mode=mode)
+
+
+def test_calibration_shrinks_items_with_few_attempts_towards_defaults():
+    # Two correct answers: Laplace p = 3/4, no variance so a stays 1, weight 2 / (2 + MIN_ATTEMPTS)
+    a, b = quiz_adaptive.calibrate_items(items(1), attempts([('q1', 'item-0', 1), ('q2', 'item-0', 1)]))
+    weight = 2 / (2 + quiz_adaptive.MIN_ATTEMPTS_FOR_CALIBRATION)
+    data_b = -np.log(0.75 / 0.25) / quiz_adaptive.SCALING
+    default_b = quiz_adaptive.DEFAULT_DIFFICULTY['MCQ']
+    assert a[0] == pytest.approx(1.0)
+    assert b[0] == pytest.approx(weight * data_b + (1 - weight) * default_b)
+
+
+def test_calibration_follows_the_data_as_attempts_grow():
+    few = attempts([(f'q{i}', 'item-0', 1) for i in range(2)])
+    many = attempts([(f'q{i}', 'item-0', 1) for i in range(200)])
+    _, b_few = quiz_adaptive.calibrate_items(items(1), few)
+    _, b_many = quiz_adaptive.calibrate_items(items(1), many)
+    assert b_many[0] < b_few[0] < quiz_adaptive.DEFAULT_DIFFICULTY['MCQ']
+
+
+def test_calibration_ignores_adaptive_attempts():
+    adaptive = attempts([(f'q{i}', 'item-0', 1) for i in range(50)], mode='adaptive')
+    a, b = quiz_adaptive.calibrate_items(items(1), adaptive)
+    assert a[0] == 1.0 and b[0] == quiz_adaptive.DEFAULT_DIFFICULTY['MCQ']
+
+
+@pytest.mark.parametrize('depth', [64, 3])  # 3 forces the full-scan fallback once the table is used up
+def test_select_matches_a_full_argmax_scan(depth):
+    rng = np.random.default_rng(0)
+    a = rng.uniform(0.3, 2.5, 40)
+    b = rng.uniform(-3, 3, 40)
+    index = quiz_adaptive.ItemInformationIndex(a, b, depth=depth)
+    for theta in quiz_adaptive.THETA_GRID[::8]:
+        info = quiz_adaptive.item_information(theta, a, b)
+        administered = set(np.argsort(-info)[:5].tolist()) | {0, 1}
+        info[list(administered)] = -np.inf
+        assert index.select(theta, administered) == int(np.argmax(info))
+
+
+def test_select_returns_none_when_every_item_is_administered():
+    index = quiz_adaptive.ItemInformationIndex(np.ones(3), np.zeros(3))
+    assert index.select(0.0, {0, 1, 2}) is None
+
+
+def test_nearest_grid_point():
+    grid = quiz_adaptive.THETA_GRID
+    assert grid[quiz_adaptive.nearest_grid_point(0.04)] == pytest.approx(0.0)
+    assert grid[quiz_adaptive.nearest_grid_point(0.06)] == pytest.approx(0.1)
+    assert quiz_adaptive.nearest_grid_point(-10) == 0
+    assert quiz_adaptive.nearest_grid_point(10) == len(grid) - 1
+
+
+@pytest.mark.parametrize('se, count, expected', [
+    (0.2, 4, False),   # Precise, but shorter than min_items
+    (0.2, 5, True),    # Precise and long enough
+    (0.5, 10, False),  # Long enough, not precise yet
+    (0.35, 10, True),  # Target is inclusive
+    (0.9, 30, True),   # Length cap
+])
+def test_should_stop(se, count, expected):
+    assert quiz_adaptive.should_stop(se, count, max_items=30, target_se=0.35, min_items=5) is expected
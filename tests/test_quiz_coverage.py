@@ -0,0 +1,42 @@
+import random
+
+import quiz_coverage
+
+
+def question(item_id, q_type, explanation):
+    return {'id': item_id, 'Type': q_type, 'Explanation': explanation}
+
+
+BANK = [
+    question('p1-a', 'TF', "Page 1 states this."),
+    question('p1-b', 'TF', "Page 1 states that."),
+    question('p2-a', 'TF', "Page 2 states this [cite: 7]."),
+    question('none-a', 'TF', "No source given."),
+    question('none-b', 'TF', ""),
+    question('none-mcq', 'MCQ', "No source given."),
+]
+
+
+def test_uncited_questions_are_indexed_by_type():
+    index = quiz_coverage.PageIndex(BANK)
+    assert {q_type: [q['id'] for q in questions] for q_type, questions in index.uncited_by_type.items()} == {
+        'TF': ['none-a', 'none-b'], 'MCQ': ['none-mcq']}
+
+
+def test_sample_gaps_starts_from_unanswered_pages():
+    index = quiz_coverage.PageIndex(BANK)
+    picked = index.sample_gaps({1: [4, 4]}, 'TF', 1, rng=random.Random(0))
+    assert [q['id'] for q in picked] == ['p2-a']
+
+
+def test_sample_gaps_tops_up_from_uncited_questions_of_the_type():
+    index = quiz_coverage.PageIndex(BANK)
+    picked = [q['id'] for q in index.sample_gaps({}, 'TF', 10, rng=random.Random(0))]
+    assert sorted(picked) == ['none-a', 'none-b', 'p1-a', 'p1-b', 'p2-a']
+    assert set(picked[3:]) == {'none-a', 'none-b'}  # Cited questions come first
+
+
+def test_item_pages_lists_every_cited_page():
+    index = quiz_coverage.PageIndex(BANK + [question('p1-p2', 'MCQ', "Page 1 and page 2 both say so.")])
+    pairs = set(index.item_pages().itertuples(index=False, name=None))
+    assert pairs == {('p1-a', 1), ('p1-b', 1), ('p2-a', 2), ('p1-p2', 1), ('p1-p2', 2)}
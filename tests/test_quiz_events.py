@@ -0,0 +1,104 @@
+import os
+import shutil
+import time
+
+import quiz_events
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def event(kind, ts, quiz='quiz-1', **fields):
+    return dict(fields, event=kind, ts=ts, seq=ts, session='s1', quiz=quiz)
+
+
+def test_replay_rebuilds_state_and_ignores_stale_quiz_events():
+    events = [
+        event('start', 1, quiz='quiz-0', items=['x']),
+        event('answer_set', 2, quiz='quiz-0', q=0, value='old'),
+        event('reset', 3, quiz='quiz-0'),
+        event('start', 4, items=['a', 'b', 'c']),
+        event('answer_set', 5, q=0, value='Alpha'),
+        event('answer_set', 6, q=2, value={'0': 'Definition A', '1': 'Definition B'}),
+        event('answer_set', 7, quiz='quiz-0', q=1, value='from a stale tab'),
+        event('flag', 8, q=1, value=True),
+        event('navigate', 9, q=2),
+        event('navigate', 10, q=3, item='d'),  # Adaptive quizzes grow one item at a time
+        event('answer_set', 11, q=3, value=True),
+        event('submit', 12, auto=False),
+    ]
+    state = quiz_events.replay_session(reversed(events))  # Sorted by time, whatever the file order
+    assert state['quiz_id'] == 'quiz-1'
+    assert state['items'] == ['a', 'b', 'c', 'd']
+    assert state['user_answers'] == {0: 'Alpha', 1: None, 2: {0: 'Definition A', 1: 'Definition B'}, 3: True}
+    assert state['flagged_questions'] == {0: False, 1: True, 2: False, 3: False}
+    assert state['current_question_index'] == 3
+    assert state['phase'] == 'results' and state['submitted'] is True
+
+
+def test_replay_after_reset_is_back_on_setup():
+    state = quiz_events.replay_session([event('start', 1, items=['a']), event('reset', 2)])
+    assert state['phase'] == 'setup' and state['previous_quiz_id'] == 'quiz-1'
+
+
+def test_replay_matches_the_app_session_state(tmp_path, monkeypatch):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    shutil.copy(os.path.join(ROOT, 'test_bank.csv'), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    # The event log and state store are per-process resources; rebuild them so they pick up these paths
+    st.cache_resource.clear()
+    monkeypatch.setenv('QUIZ_EVENT_LOG_DIR', str(tmp_path / 'event_logs'))
+    monkeypatch.setenv('QUIZ_STATE_DB', str(tmp_path / 'sessions.db'))
+    at = AppTest.from_file(os.path.join(ROOT, 'quiz_webapp.py'), default_timeout=60).run()
+    at.number_input(key='select_TF').set_value(3).run()
+    [b for b in at.button if b.label == 'Start Quiz'][0].click().run()
+    at.radio[0].set_value('True').run()
+    [b for b in at.button if 'Next' in b.label][0].click().run()
+    at.radio[0].set_value('False').run()
+    [b for b in at.button if b.label == '⚐'][0].click().run()
+    [b for b in at.sidebar.button if b.label.startswith('Q 1')][0].click().run()
+    [b for b in at.sidebar.button if b.label == 'Submit Quiz'][0].click().run()
+    assert not at.exception
+
+    log_dir = str(tmp_path / 'event_logs')
+    deadline = time.time() + 10
+    events = []
+    while time.time() < deadline and not any(e['event'] == 'submit' for e in events):
+        time.sleep(0.2)
+        events = list(quiz_events.read_events(log_dir, at.session_state.session_id))
+    state = quiz_events.replay_session(events)
+
+    assert state['quiz_id'] == at.session_state.quiz_id
+    assert state['items'] == [q['id'] for q in at.session_state.quiz_pool]
+    assert state['user_answers'] == at.session_state.user_answers
+    assert state['flagged_questions'] == at.session_state.flagged_questions
+    assert state['current_question_index'] == at.session_state.current_question_index
+    assert state['submitted'] is at.session_state.submitted is True
+
+
+def test_writer_starts_a_new_file_when_the_current_one_disappears(tmp_path):
+    log = quiz_events.EventLog(str(tmp_path), flush_interval=0.01)
+    log.emit({'event': 'start'})
+    log.flush()
+    for filename in os.listdir(tmp_path):
+        os.remove(tmp_path / filename)
+    log.emit({'event': 'answer_set'})
+    log.flush()
+    log.emit({'event': 'submit'})
+    log.flush()
+    assert log.stats()['write_errors'] == 0
+    assert [e['event'] for e in quiz_events.read_events(str(tmp_path))] == ['answer_set', 'submit']
+
+
+def test_retention_counts_files_from_other_processes(tmp_path):
+    for i in range(5):
+        old = tmp_path / f'events-2020010{i}T000000000000-1.jsonl'
+        old.write_text('{"event": "old"}\n', encoding='utf-8')
+        os.utime(old, (1000 + i, 1000 + i))
+    log = quiz_events.EventLog(str(tmp_path), flush_interval=0.01, max_files=3)
+    log.emit({'event': 'start'})
+    log.flush()
+    remaining = sorted(os.listdir(tmp_path))
+    assert len(remaining) == 3
+    assert remaining[:2] == ['events-20200103T000000000000-1.jsonl', 'events-20200104T000000000000-1.jsonl']
@@ -0,0 +1,81 @@
+import pytest
+
+import quiz_bank
+import quiz_lint
+
+HEADER = "Type,Question,CorrectAnswer,Distractor1,Distractor2,Distractor3,Explanation\n"
+
+# code: (bank rows after the header, spreadsheet row the issue is reported on)
+FIXTURES = {
+    'empty_bank': ("", None),
+    'unknown_type': ("Essay,Describe it,Answer,,,,x\n", 2),
+    'missing_question': ("MCQ,,A,B,C,D,x\n", 2),
+    'missing_answer': ("FillBlank,The ___ is blue,,,,,x\n", 2),
+    'tf_answer_invalid': ("TF,The sky is blue,Yes,,,,x\n", 2),
+    'mcq_no_distractors': ("MCQ,Pick one,A,,,,x\n", 2),
+    'mcq_distractor_is_answer': ("MCQ,Pick one,Alpha,B, alpha ,D,x\n", 2),
+    'mcq_duplicate_distractor': ("MCQ,Pick one,A,B,b,D,x\n", 2),
+    'matching_missing_group': ("Matching,Match terms for group:,Term,Definition,,,x\n", 2),
+    'matching_missing_term': ("Matching,Match terms for group: Ranks,,Definition,,,x\n", 2),
+    'matching_missing_definition': ("Matching,Match terms for group: Ranks,Term,,,,x\n", 2),
+    'matching_duplicate_term': (
+        "Matching,Match terms for group: Ranks,Term,First,,,x\n"
+        "Matching,Match terms for group: Ranks,term,Second,,,x\n", 3),
+    'matching_duplicate_definition': (
+        "Matching,Match terms for group: Ranks,One,Same,,,x\n"
+        "Matching,Match terms for group: Ranks,Two,same,,,x\n", 3),
+    'duplicate_question': (
+        "TF,The sky is blue,True,,,,x\n"
+        "TF,The  sky is BLUE,False,,,,x\n", 3),
+    'extra_columns': ("MCQ,Pick one,A,B,C,D,Page 4 says this, and that\n", 2),
+}
+
+
+def lint_text(tmp_path, text):
+    bank = tmp_path / 'bank.csv'
+    bank.write_bytes(text if isinstance(text, bytes) else text.encode('utf-8'))
+    return quiz_lint.lint_bank(str(bank))
+
+
+def test_every_check_has_a_fixture():
+    assert set(FIXTURES) == set(quiz_lint.LINT_CHECKS)
+
+
+@pytest.mark.parametrize('code', sorted(FIXTURES))
+def test_check_reports_its_row(tmp_path, code):
+    rows, expected_row = FIXTURES[code]
+    report = lint_text(tmp_path, HEADER + rows)
+    assert {'row': expected_row, 'code': code} in [{'row': i['row'], 'code': i['code']} for i in report['issues']]
+
+
+def test_clean_bank_has_no_issues(tmp_path):
+    report = lint_text(tmp_path, HEADER + "MCQ,Pick one,A,B,C,D,x\nTF,The sky is blue,True,,,,x\n"
+                                          "Matching,Match terms for group: Ranks,Term,Definition,,,x\n")
+    assert report['issues'] == []
+
+
+def test_over_wide_row_does_not_stop_other_checks(tmp_path):
+    report = lint_text(tmp_path, HEADER + "TF,Q1,True,,,,x\n"
+                                          "MCQ,Q2,A,B,C,D,one, two, three\n"
+                                          "TF,Q3,Maybe,,,,x\n")
+    found = [(issue['row'], issue['code']) for issue in report['issues']]
+    assert found == [(3, 'extra_columns'), (4, 'tf_answer_invalid')]
+    assert report['rows'] == 3
+
+
+def test_unreadable_file_is_malformed_csv(tmp_path):
+    report = lint_text(tmp_path, HEADER.encode('utf-8') + b"TF,Caf\xe9,True,,,,x\n")
+    assert [issue['code'] for issue in report['issues']] == ['malformed_csv']
+    assert report['errors'] == 1
+
+
+def test_header_only_bank_fails_strict_lint(tmp_path):
+    bank = tmp_path / 'bank.csv'
+    bank.write_text(HEADER, encoding='utf-8')
+    assert quiz_bank.main(['lint', str(bank), '--strict']) == 1
+
+
+def test_mcq_checks_compare_options_like_grading(tmp_path):
+    # Grading trims and ignores case but keeps inner whitespace, so these are different options
+    report = lint_text(tmp_path, HEADER + "MCQ,Pick one,Air Force,Air  Force,AIR FORCE ,C,x\n")
+    assert [issue['code'] for issue in report['issues']] == ['mcq_distractor_is_answer']
@@ -0,0 +1,59 @@
+import threading
+
+import quiz_prefetch
+
+
+def blocked_build(started, release, result='quiz'):
+    def build(cancelled):
+        started.set()
+        release.wait(5)
+        return None if cancelled.is_set() else result
+    return build
+
+
+def test_take_returns_the_result_for_the_same_signature():
+    prefetcher = quiz_prefetch.QuizPrefetcher(max_workers=1)
+    prefetcher.prefetch('session', 'settings', lambda cancelled: 'quiz')
+    assert prefetcher.take('session', 'settings') == 'quiz'
+    assert prefetcher.take('session', 'settings') is None  # Handed out once
+    assert prefetcher.stats()['hits'] == 1
+
+
+def test_mismatched_signature_is_discarded():
+    prefetcher = quiz_prefetch.QuizPrefetcher(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+    prefetcher.prefetch('session', 'old settings', blocked_build(started, release))
+    assert started.wait(5)
+    assert prefetcher.take('session', 'new settings') is None
+    release.set()
+    assert prefetcher.take('session', 'old settings') is None  # The stale build was dropped, not kept
+    assert prefetcher.stats()['cancelled'] == 1 and prefetcher.stats()['pending'] == 0
+
+
+def test_cancel_stops_a_running_build():
+    prefetcher = quiz_prefetch.QuizPrefetcher(max_workers=1)
+    started = threading.Event()
+    seen = {}
+
+    def build(cancelled):
+        started.set()
+        seen['cancelled'] = cancelled.wait(5)
+        return 'quiz'
+
+    prefetcher.prefetch('session', 'settings', build)
+    assert started.wait(5)
+    prefetcher.cancel('session')
+    assert prefetcher.take('session', 'settings') is None
+    prefetcher._executor.shutdown(wait=True)
+    assert seen['cancelled'] is True
+
+
+def test_take_does_not_wait_behind_other_sessions_builds():
+    prefetcher = quiz_prefetch.QuizPrefetcher(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+    prefetcher.prefetch('other', 'settings', blocked_build(started, release))
+    assert started.wait(5)
+    prefetcher.prefetch('session', 'settings', lambda cancelled: 'quiz')  # Queued behind 'other'
+    assert prefetcher.take('session', 'settings') is None  # Cancelled, not awaited
+    release.set()
+    assert prefetcher.take('other', 'settings') == 'quiz'
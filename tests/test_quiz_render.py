@@ -0,0 +1,38 @@
+import quiz_render
+
+
+def entry(key):
+    return {'question_md': f"**Question {key}**"}
+
+
+def test_evicts_least_recently_used_entries_over_the_byte_budget():
+    size = quiz_render.estimate_size(entry('a'))
+    cache = quiz_render.RenderCache(max_bytes=size * 2)
+    cache.get_or_render('a', lambda: entry('a'))
+    cache.get_or_render('b', lambda: entry('b'))
+    cache.get_or_render('a', lambda: entry('a'))  # Hit: 'b' is now the least recently used
+    cache.get_or_render('c', lambda: entry('c'))
+
+    renders = []
+    cache.get_or_render('a', lambda: renders.append('a') or entry('a'))
+    cache.get_or_render('b', lambda: renders.append('b') or entry('b'))
+    assert renders == ['b']
+    stats = cache.stats()
+    assert stats['evictions'] == 2  # 'b' first, then 'c' to make room for 'b' again
+    assert stats['bytes'] <= size * 2 and stats['entries'] == 2
+
+
+def test_entry_larger_than_the_budget_is_served_uncached():
+    cache = quiz_render.RenderCache(max_bytes=10)
+    assert cache.get_or_render('big', lambda: entry('big')) == entry('big')
+    assert cache.stats()['entries'] == 0 and cache.stats()['bytes'] == 0
+
+
+def test_questions_are_cached_per_bank_version():
+    cache = quiz_render.RenderCache()
+    q_data = {'id': 'q1', 'Type': 'MCQ', 'Question': 'Pick', 'CorrectAnswer': 'A', 'Distractors': ['B', 'C']}
+    first = cache.get_question(q_data, 'v1')
+    assert cache.get_question(q_data, 'v1') is first
+    assert first['options'] == ('B', 'C', 'A')
+    cache.get_question(q_data, 'v2')
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
@@ -0,0 +1,94 @@
+import time
+
+import quiz_state
+
+
+class RecordingBackend(quiz_state.StateBackend):
+    """In-memory backend that records every batch it is asked to save."""
+
+    def __init__(self):
+        self.rows = {}
+        self.batches = []
+
+    def load(self, session_id):
+        return self.rows.get(session_id)
+
+    def save(self, session_id, payload):
+        self.save_many([(session_id, payload)])
+
+    def save_many(self, items):
+        self.batches.append(sorted(session_id for session_id, _ in items))
+        self.rows.update(items)
+
+    def delete(self, session_id):
+        self.rows.pop(session_id, None)
+
+    def prune(self, older_than):
+        return 0
+
+
+def cache(backend):
+    # A long interval keeps the background thread out of the way; tests call flush() themselves
+    return quiz_state.WriteBehindCache(backend, flush_interval=3600)
+
+
+def test_state_round_trips_int_keyed_answers():
+    state = {
+        'user_answers': {0: 'Alpha', 1: True, 2: None, 3: {0: 'Definition A', 2: 'Definition C'}},
+        'flagged_questions': {0: False, 1: True},
+        'matching_answers': {3: {0: 1, 1: 0}},
+        'shuffled_mcq_options': {0: ['B', 'A', 'C']},
+        'selected_counts': {'MCQ': 2, 'TF': 0},
+        'adaptive_estimate': [0.5, 0.3],
+        'empty': {},
+    }
+    assert quiz_state.loads_state(quiz_state.dumps_state(state)) == state
+
+
+def test_flush_writes_dirty_sessions_once():
+    backend = RecordingBackend()
+    store = cache(backend)
+    store.put('a', {'user_answers': {0: 'x'}})
+    store.put('b', {'user_answers': {0: 'y'}})
+    store.flush()
+    assert backend.batches == [['a', 'b']]
+
+    store.put('a', {'user_answers': {0: 'x'}})  # Unchanged: not dirty again
+    store.flush()
+    assert backend.batches == [['a', 'b']]
+
+    store.put('a', {'user_answers': {0: 'z'}})
+    store.flush()
+    assert backend.batches == [['a', 'b'], ['a']]
+    assert quiz_state.loads_state(backend.rows['a']) == {'user_answers': {0: 'z'}}
+
+
+def test_get_prefers_unflushed_state():
+    backend = RecordingBackend()
+    store = cache(backend)
+    store.put('a', {'current_question_index': 3})
+    assert store.get('a') == {'current_question_index': 3}
+    assert backend.rows == {}
+
+
+def test_sqlite_prune_removes_only_stale_sessions(tmp_path):
+    backend = quiz_state.SQLiteStateBackend(str(tmp_path / 'sessions.db'))
+    backend.save('old', '{}')
+    cutoff = time.time()
+    time.sleep(0.01)
+    backend.save('new', '{}')
+    assert backend.prune(cutoff) == 1
+    assert backend.load('old') is None
+    assert backend.load('new') == '{}'
+
+
+def test_cache_prune_applies_session_ttl(tmp_path):
+    backend = quiz_state.SQLiteStateBackend(str(tmp_path / 'sessions.db'))
+    store = quiz_state.WriteBehindCache(backend, flush_interval=3600, session_ttl=60)
+    store.put('recent', {'submitted': False})
+    store.flush()
+    with backend._connect() as conn:
+        conn.execute("INSERT INTO quiz_sessions VALUES ('abandoned', '{}', ?)", (time.time() - 3600,))
+    assert store.prune() == 1
+    assert backend.load('abandoned') is None
+    assert store.get('recent') == {'submitted': False}